@@ -0,0 +1,278 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import urllib.request
+from typing import List, Optional
+from .convert import to_int, to_float, to_bool
+from service.svn_sync import sync_paths, svn_batch
+from service.tree_sync import file_digest
+from service.url_sync import url_sync as sync_urls, join_url
+from utils.logger import SyncLogger
+from utils.process import run_command, spawn_count
+
+TREE = "tree"
+SINGLE = "single.dat"
+
+def _repo_url(base: str, name: str) -> str:
+    """
+    本地仓库的 file:// 地址
+    """
+    return "file://" + urllib.request.pathname2url(os.path.abspath(os.path.join(base, f"repo-{name}")))
+
+def _make_repo(base: str, name: str) -> str:
+    """
+    用 svnadmin create 创建本地仓库并检出
+    :param base: 基准目录
+    :param name: 仓库名
+    :return: 工作副本路径
+    """
+    repo = os.path.join(base, f"repo-{name}")
+    wc = os.path.join(base, f"wc-{name}")
+    run_command(["svnadmin", "create", repo])
+    run_command(["svn", "checkout", "--quiet", _repo_url(base, name), wc])
+    return wc
+
+def _leaf_dirs(depth: int, fanout: int) -> List[str]:
+    """
+    生成指定深度和分叉数的叶子目录列表（相对 TREE）
+    :param depth: 目录深度
+    :param fanout: 每层子目录数
+    :return: 叶子目录列表
+    """
+    dirs = [""]
+    for level in range(depth):
+        dirs = [os.path.join(d, f"d{level}-{i}") for d in dirs for i in range(fanout)]
+    return dirs
+
+def _write(path: str, size: int, rng: random.Random) -> None:
+    """
+    写入指定大小的随机内容
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(rng.randbytes(size))
+
+def _build_tree(wc: str, files: int, depth: int, fanout: int, size: int,
+                rng: random.Random) -> List[str]:
+    """
+    在源工作副本中生成合成目录树并提交
+    :return: 文件列表（相对工作副本）
+    """
+    leaves = _leaf_dirs(depth, fanout)
+    paths = [os.path.join(TREE, leaves[i % len(leaves)], f"f{i}.dat") for i in range(files)]
+    for path in paths:
+        _write(os.path.join(wc, path), size, rng)
+    run_command(["svn", "add", "--quiet", TREE], cwd=wc)
+    run_command(["svn", "commit", "--quiet", "-m", "bench: initial tree"], cwd=wc)
+    return paths
+
+def _apply_changes(wc: str, paths: List[str], count: int, size: int, run: int,
+                   rng: random.Random, logger: SyncLogger) -> dict:
+    """
+    在源工作副本中应用合成变更（新增、修改、删除、重命名）并提交
+    :param paths: 当前文件列表，会被原地更新
+    :param count: 变更文件总数，平均分给四种变更
+    :return: 各类变更数量
+    """
+    per_kind = max(1, count // 4)
+    picked = rng.sample(paths, min(len(paths), per_kind * 3))
+    modified = picked[:per_kind]
+    deleted = picked[per_kind:per_kind * 2]
+    renamed = picked[per_kind * 2:]
+    added = [
+        os.path.join(os.path.dirname(rng.choice(paths)), f"add-{run}-{i}.dat")
+        for i in range(per_kind)
+    ]
+
+    for path in modified:
+        _write(os.path.join(wc, path), size, rng)
+    for path in added:
+        _write(os.path.join(wc, path), size, rng)
+    targets = []
+    for path in renamed:
+        target = os.path.join(os.path.dirname(path), f"mv-{run}-{os.path.basename(path)}")
+        os.rename(os.path.join(wc, path), os.path.join(wc, target))
+        targets.append(target)
+    for path in deleted:
+        os.remove(os.path.join(wc, path))
+
+    svn_batch("add", added + targets, wc, logger)
+    svn_batch("delete", deleted + renamed, wc, logger)
+    run_command(["svn", "commit", "--quiet", "-m", f"bench: change set {run}"], cwd=wc)
+
+    gone = set(deleted) | set(renamed)
+    paths[:] = [p for p in paths if p not in gone] + added + targets
+    return {
+        "added": len(added),
+        "modified": len(modified),
+        "deleted": len(deleted),
+        "renamed": len(renamed),
+    }
+
+def _measure(label: str, wc_a: str, wc_b: str, manifest_db: str, logger: SyncLogger,
+             params: dict, changes: Optional[dict]) -> dict:
+    """
+    执行一次同步并收集耗时、吞吐量和进程启动次数
+    """
+    stats = {}
+    spawns = spawn_count()
+    started = time.monotonic()
+    summary = sync_paths([TREE], logger, wc_a, wc_b, manifest_db=manifest_db, stats=stats)[TREE]
+    seconds = time.monotonic() - started
+    files = summary["added"] + summary["updated"] + summary["removed"] + summary["unchanged"]
+    return {
+        "bench": "sync",
+        "run": label,
+        **params,
+        "changes": changes,
+        "seconds": round(seconds, 4),
+        "files": files,
+        "files_per_sec": round(files / seconds, 1) if seconds else None,
+        "bytes_copied": summary["bytes_copied"],
+        "bytes_per_sec": round(summary["bytes_copied"] / seconds, 1) if seconds else None,
+        "copy_seconds": round(summary["copy_seconds"], 4),
+        "added": summary["added"],
+        "updated": summary["updated"],
+        "removed": summary["removed"],
+        "unchanged": summary["unchanged"],
+        "spawns": spawn_count() - spawns,
+        "stages": {name: round(end - start, 4) for name, (start, end) in stats.get("stages", {}).items()},
+        "critical_path": stats.get("critical_path", []),
+    }
+
+def sync(files: str = '1000', depth: str = '3', fanout: str = '4', size: str = '4096',
+         change_ratio: str = '0.1', runs: str = '3', seed: str = '1',
+         workdir: Optional[str] = None, keep: str = 'false') -> None:
+    """
+    基于本地 file:// 仓库的同步基准测试，每次同步输出一行 JSON
+    运行顺序：initial（全量）→ change-N（每轮应用一组合成变更）→ noop（无变更）
+    :param files: 文件数量
+    :param depth: 目录深度
+    :param fanout: 每层子目录数
+    :param size: 单个文件大小（字节）
+    :param change_ratio: 每轮变更的文件比例
+    :param runs: 变更轮数
+    :param seed: 随机种子，相同参数和种子生成相同的工作负载
+    :param workdir: 工作目录（默认使用临时目录）
+    :param keep: 结束后是否保留工作目录
+    """
+    files, depth, fanout = to_int(files, 1000), to_int(depth, 3), to_int(fanout, 4)
+    size, runs = to_int(size, 4096), to_int(runs, 3)
+    change_ratio = to_float(change_ratio, 0.1)
+    rng = random.Random(to_int(seed, 1))
+    base = workdir or tempfile.mkdtemp(prefix="svn-sync-bench-")
+    os.makedirs(base, exist_ok=True)
+    params = {"files_total": files, "depth": depth, "fanout": fanout, "size": size,
+              "change_ratio": change_ratio}
+    logger = SyncLogger(os.path.join(base, "bench.log"), to_stdout=False)
+    manifest_db = os.path.join(base, "manifest.db")
+
+    try:
+        wc_a = _make_repo(base, "a")
+        wc_b = _make_repo(base, "b")
+        paths = _build_tree(wc_a, files, depth, fanout, size, rng)
+        print(json.dumps(_measure("initial", wc_a, wc_b, manifest_db, logger, params, None)), flush=True)
+
+        for run in range(1, runs + 1):
+            changes = _apply_changes(wc_a, paths, max(1, int(len(paths) * change_ratio)), size, run, rng, logger)
+            print(json.dumps(_measure(f"change-{run}", wc_a, wc_b, manifest_db, logger, params, changes)), flush=True)
+
+        print(json.dumps(_measure("noop", wc_a, wc_b, manifest_db, logger, params, None)), flush=True)
+    finally:
+        # 日志写入线程必须在删除工作目录之前写完并关闭文件
+        logger.flush()
+        logger.writer.close()
+        if not to_bool(keep) and not workdir:
+            shutil.rmtree(base, ignore_errors=True)
+
+def _export_digests(url: str, dest: str) -> dict:
+    """
+    导出 URL 并计算内容摘要
+    :param url: 文件或目录地址
+    :param dest: 导出位置（不能已存在）
+    :return: 相对路径 -> 摘要（目录为 None，文件本身为 ""）
+    """
+    run_command(["svn", "export", "--quiet", url, dest])
+    if os.path.isfile(dest):
+        return {"": file_digest(dest)}
+    digests = {}
+    for dirpath, dirnames, filenames in os.walk(dest):
+        for name in dirnames:
+            digests[os.path.relpath(os.path.join(dirpath, name), dest)] = None
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            digests[os.path.relpath(path, dest)] = file_digest(path)
+    return digests
+
+def url_sync(files: str = '200', depth: str = '2', fanout: str = '3', size: str = '1024',
+             change_ratio: str = '0.1', runs: str = '3', seed: str = '1',
+             workdir: Optional[str] = None, keep: str = 'false') -> None:
+    """
+    基于本地 file:// 仓库的 URL 同步（svnmucc）测试，每次同步输出一行 JSON
+    同步目录 TREE 和单个文件 SINGLE，每次同步后导出两侧内容比较（match），
+    运行顺序：initial（全量）→ change-N（合成变更，SINGLE 每轮修改）→ noop
+    参数同 sync
+    :raises RuntimeError: 任一次同步后目标与源内容不一致
+    """
+    files, depth, fanout = to_int(files, 200), to_int(depth, 2), to_int(fanout, 3)
+    size, runs = to_int(size, 1024), to_int(runs, 3)
+    change_ratio = to_float(change_ratio, 0.1)
+    rng = random.Random(to_int(seed, 1))
+    base = workdir or tempfile.mkdtemp(prefix="svn-url-sync-bench-")
+    os.makedirs(base, exist_ok=True)
+    logger = SyncLogger(os.path.join(base, "bench.log"), to_stdout=False)
+    state_db = os.path.join(base, "url_sync_state.db")
+    src_url, dst_url = _repo_url(base, "a"), _repo_url(base, "b")
+    mismatched = []
+
+    def measure(label: str, changes: Optional[dict]) -> None:
+        spawns = spawn_count()
+        started = time.monotonic()
+        summaries = sync_urls(src_url, dst_url, [TREE, SINGLE], logger, state_db)
+        seconds = time.monotonic() - started
+        exports = tempfile.mkdtemp(prefix="export-", dir=base)
+        match = all(
+            _export_digests(join_url(src_url, path), os.path.join(exports, f"src-{i}"))
+            == _export_digests(join_url(dst_url, path), os.path.join(exports, f"dst-{i}"))
+            for i, path in enumerate((TREE, SINGLE))
+        )
+        shutil.rmtree(exports)
+        if not match:
+            mismatched.append(label)
+        print(json.dumps({
+            "bench": "url_sync",
+            "run": label,
+            "files_total": files,
+            "changes": changes,
+            "seconds": round(seconds, 4),
+            "spawns": spawn_count() - spawns,
+            "match": match,
+            "summaries": summaries,
+        }), flush=True)
+
+    try:
+        wc_a = _make_repo(base, "a")
+        _make_repo(base, "b")
+        paths = _build_tree(wc_a, files, depth, fanout, size, rng)
+        _write(os.path.join(wc_a, SINGLE), size, rng)
+        run_command(["svn", "add", "--quiet", SINGLE], cwd=wc_a)
+        run_command(["svn", "commit", "--quiet", "-m", "bench: single file"], cwd=wc_a)
+        measure("initial", None)
+
+        for run in range(1, runs + 1):
+            # _apply_changes 提交整个工作副本，包括 SINGLE 的修改
+            _write(os.path.join(wc_a, SINGLE), size + run, rng)
+            changes = _apply_changes(wc_a, paths, max(1, int(len(paths) * change_ratio)), size, run, rng, logger)
+            measure(f"change-{run}", changes)
+
+        measure("noop", None)
+    finally:
+        logger.flush()
+        logger.writer.close()
+        if not to_bool(keep) and not workdir:
+            shutil.rmtree(base, ignore_errors=True)
+    if mismatched:
+        raise RuntimeError(f"Target differs from source after: {', '.join(mismatched)}")
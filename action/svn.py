@@ -1,5 +1,11 @@
+import json
+import shlex
 from typing import List, Optional
-from core.svn import SVNClient
+from core.svn import get_client
+from core.svn_log_cache import SVNLogCache
+from service.url_sync import url_sync
+from utils.logger import SyncLogger
+from config.svn import SVN_MAX_WORKERS, SVN_COMMAND_TIMEOUT, SVN_LOG_CACHE_DB, LOG_FILE
 
 def checkout(url: str, path: str, revision: Optional[int] = None) -> bool:
     """
@@ -9,7 +15,7 @@ def checkout(url: str, path: str, revision: Optional[int] = None) -> bool:
     :param revision: 版本号（可选）
     :return: 是否成功
     """
-    client = SVNClient()
+    client = get_client()
     return client.checkout(url, path, revision)
 
 def update(path: str, revision: Optional[int] = None) -> bool:
@@ -19,7 +25,7 @@ def update(path: str, revision: Optional[int] = None) -> bool:
     :param revision: 版本号（可选）
     :return: 是否成功
     """
-    client = SVNClient()
+    client = get_client()
     return client.update(path, revision)
 
 def commit(path: str, message: str) -> bool:
@@ -29,7 +35,7 @@ def commit(path: str, message: str) -> bool:
     :param message: 提交信息
     :return: 是否成功
     """
-    client = SVNClient()
+    client = get_client()
     return client.commit(path, message)
 
 def status(path: str) -> List[dict]:
@@ -38,7 +44,7 @@ def status(path: str) -> List[dict]:
     :param path: 本地路径
     :return: 状态列表
     """
-    client = SVNClient()
+    client = get_client()
     return client.status(path)
 
 def info(path: str) -> Optional[dict]:
@@ -47,7 +53,7 @@ def info(path: str) -> Optional[dict]:
     :param path: 本地路径
     :return: 文件信息
     """
-    client = SVNClient()
+    client = get_client()
     return client.info(path)
 
 def log(path: str, limit: int = 10) -> List[dict]:
@@ -57,9 +63,37 @@ def log(path: str, limit: int = 10) -> List[dict]:
     :param limit: 日志数量限制
     :return: 日志列表
     """
-    client = SVNClient()
+    client = get_client()
     return client.log(path, limit)
 
+def log_cached(path: str, limit: int = 10, verbose: str = '') -> List[dict]:
+    """
+    从本地缓存获取提交日志（先增量同步服务器上的新修订）
+    :param path: 本地路径或 URL
+    :param limit: 日志数量限制
+    :param verbose: 非空时包含变更路径
+    :return: 日志列表
+    """
+    cache = SVNLogCache(SVN_LOG_CACHE_DB, get_client())
+    try:
+        return cache.log(path, int(limit), verbose=bool(verbose))
+    finally:
+        cache.close()
+
+def search_log(path: str, text: str, limit: int = 10) -> List[dict]:
+    """
+    在本地缓存中按提交信息搜索日志
+    :param path: 本地路径或 URL
+    :param text: 搜索内容
+    :param limit: 日志数量限制
+    :return: 日志列表
+    """
+    cache = SVNLogCache(SVN_LOG_CACHE_DB, get_client())
+    try:
+        return cache.search(path, text, int(limit))
+    finally:
+        cache.close()
+
 def diff(path: str, revision1: Optional[int] = None, revision2: Optional[int] = None) -> Optional[str]:
     """
     获取文件差异
@@ -68,16 +102,41 @@ def diff(path: str, revision1: Optional[int] = None, revision2: Optional[int] =
     :param revision2: 结束版本（可选）
     :return: 差异内容
     """
-    client = SVNClient()
+    client = get_client()
     return client.diff(path, revision1, revision2)
 
+def diff_summary(path: str, revision1: Optional[int] = None, revision2: Optional[int] = None) -> List[dict]:
+    """
+    获取变更文件摘要（不包含差异内容）
+    :param path: 本地路径或 URL
+    :param revision1: 起始版本（可选）
+    :param revision2: 结束版本（可选）
+    :return: 变更列表
+    """
+    client = get_client()
+    return client.diff_summary(path, revision1, revision2)
+
+def diff_stat(path: str, revision1: Optional[int] = None, revision2: Optional[int] = None) -> List[dict]:
+    """
+    流式统计每个文件新增/删除的行数，不在内存中保留差异内容
+    :param path: 本地路径或 URL
+    :param revision1: 起始版本（可选）
+    :param revision2: 结束版本（可选）
+    :return: 每个文件的 path/added/removed
+    """
+    client = get_client()
+    return [
+        {'path': entry['path'], 'added': entry['added'], 'removed': entry['removed']}
+        for entry in client.iter_diff(path, revision1, revision2, stats=True, hunks=False)
+    ]
+
 def list(url: str) -> List[str]:
     """
     列出目录内容
     :param url: SVN 仓库地址
     :return: 文件列表
     """
-    client = SVNClient()
+    client = get_client()
     return client.list(url)
 
 def mkdir(url: str, message: str) -> bool:
@@ -87,7 +146,7 @@ def mkdir(url: str, message: str) -> bool:
     :param message: 提交信息
     :return: 是否成功
     """
-    client = SVNClient()
+    client = get_client()
     return client.mkdir(url, message)
 
 def move(src: str, dst: str, message: str) -> bool:
@@ -98,7 +157,7 @@ def move(src: str, dst: str, message: str) -> bool:
     :param message: 提交信息
     :return: 是否成功
     """
-    client = SVNClient()
+    client = get_client()
     return client.move(src, dst, message)
 
 def copy(src: str, dst: str, message: str) -> bool:
@@ -109,6 +168,60 @@ def copy(src: str, dst: str, message: str) -> bool:
     :param message: 提交信息
     :return: 是否成功
     """
-    client = SVNClient()
+    client = get_client()
     return client.copy(src, dst, message)
- 
\ No newline at end of file
+ 
+
+def mirror(src_url: str, dst_url: str, *paths: str) -> dict:
+    """
+    不使用工作副本，将源 URL 下的路径通过一次 svnmucc 原子提交镜像到目标 URL
+    :param src_url: 源仓库地址
+    :param dst_url: 目标仓库地址
+    :param paths: 要镜像的相对路径，目录或单个文件（默认整个 src_url）
+    :return: 各路径的变更统计
+    """
+    logger = SyncLogger(LOG_FILE, to_stdout=True)
+    return url_sync(src_url, dst_url, paths or ('.',), logger)
+
+def _print_many(results) -> None:
+    """按完成顺序逐行输出批量操作结果"""
+    for path, result, error in results:
+        record = {'path': path, 'result': result} if error is None else {'path': path, 'error': error}
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
+def status_many(*paths: str) -> None:
+    """
+    并发获取多个工作副本的状态，结果按完成顺序逐行输出为 JSON
+    :param paths: 本地路径列表
+    """
+    _print_many(get_client().status_many(paths, max_workers=SVN_MAX_WORKERS,
+                                         timeout=SVN_COMMAND_TIMEOUT))
+
+def update_many(*paths: str) -> None:
+    """
+    并发更新多个工作副本，结果按完成顺序逐行输出为 JSON
+    :param paths: 本地路径列表
+    """
+    _print_many(get_client().update_many(paths, max_workers=SVN_MAX_WORKERS,
+                                         timeout=SVN_COMMAND_TIMEOUT))
+
+def run(*operations: str) -> None:
+    """
+    在一次调用中执行多个 SVN 操作，共享同一个客户端，结果按行输出为 JSON
+    例如：python main.py svn.run "info /path/a" "status /path/b" "log /path/a 5"
+    :param operations: 操作列表，每项为 "函数名 参数..."
+    """
+    for operation in operations:
+        parts = shlex.split(operation)
+        if not parts:
+            continue
+        name, args = parts[0], parts[1:]
+        func = globals().get(name)
+        if name in ('run', 'status_many', 'update_many') or name.startswith('_') or not callable(func) or func.__module__ != __name__:
+            print(json.dumps({'operation': operation, 'error': f"Unknown operation '{name}'"}))
+            continue
+        try:
+            result = func(*args)
+            print(json.dumps({'operation': operation, 'result': result}, ensure_ascii=False))
+        except Exception as e:
+            print(json.dumps({'operation': operation, 'error': str(e)}, ensure_ascii=False))
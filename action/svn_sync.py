@@ -1,32 +1,110 @@
 import argparse
-from service.svn_sync import sync_paths
+import sys
+from service.scheduler import (
+    load_pairs, select_pairs, run_pairs, run_schedule, watch_pairs, format_result
+)
 from utils.logger import SyncLogger
-from config.svn import LOG_FILE
+from config.svn import (
+    LOG_FILE, SYNC_PAIRS_FILE, SYNC_MAX_PARALLEL_PAIRS, SYNC_WATCH_DEBOUNCE,
+    SYNC_REVISION_POLL_INTERVAL
+)
 
-def main():
+def main(*argv):
     parser = argparse.ArgumentParser(
-        description="Synchronize directories between two SVN repositories"
+        description="Synchronize directories between pairs of SVN repositories"
     )
     parser.add_argument(
         "--paths",
-        required=True,
-        help="Comma-separated list of subdirectory paths to sync"
-    )
-    
-    args = parser.parse_args()
-    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
-    
-    if not paths:
-        print("Error: No valid paths provided")
-        return 1
-        
+        help="Comma-separated list of subdirectory paths to sync "
+             "(defaults to the paths configured for each pair)"
+    )
+    parser.add_argument(
+        "--pairs",
+        help="Comma-separated list of configured pair names to sync (default: all)"
+    )
+    parser.add_argument(
+        "--config",
+        default=SYNC_PAIRS_FILE,
+        help="JSON file listing sync pairs"
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=SYNC_MAX_PARALLEL_PAIRS,
+        help="Maximum number of pairs synced at once"
+    )
+    parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help="Keep running, syncing each pair on its configured interval"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, syncing changed source paths as soon as they change"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=SYNC_WATCH_DEBOUNCE,
+        help="Seconds without changes before a watched burst is synced"
+    )
+    parser.add_argument(
+        "--poll-revisions",
+        type=float,
+        default=SYNC_REVISION_POLL_INTERVAL,
+        help="Seconds between checks for new revisions of the source while watching (0: off)"
+    )
+
+    # main.py passes the arguments after svn_sync.main
+    args = parser.parse_args(list(argv))
+    paths = [p.strip() for p in (args.paths or "").split(",") if p.strip()]
+    names = [n.strip() for n in (args.pairs or "").split(",") if n.strip()]
     logger = SyncLogger(LOG_FILE, to_stdout=True)
+
     try:
-        sync_paths(paths, logger)
-        return 0
-    except Exception as e:
+        pairs = select_pairs(load_pairs(args.config), names)
+    except (OSError, ValueError) as e:
         print(f"Error: {str(e)}")
         return 1
 
+    if args.watch:
+        if paths:
+            for pair in pairs:
+                pair.paths = paths
+        try:
+            watch_pairs(
+                pairs, to_stdout=True,
+                on_result=lambda result: logger.log(format_result(result)),
+                debounce=args.debounce, revision_interval=args.poll_revisions
+            )
+            return 0
+        except KeyboardInterrupt:
+            return 0
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return 1
+
+    if args.schedule:
+        try:
+            run_schedule(
+                pairs, args.max_parallel, to_stdout=True,
+                on_result=lambda result: logger.log(format_result(result))
+            )
+        except KeyboardInterrupt:
+            return 0
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return 1
+
+    if not paths and not all(pair.paths for pair in pairs):
+        print("Error: No valid paths provided")
+        return 1
+
+    results = run_pairs(pairs, paths, args.max_parallel, to_stdout=True)
+    for result in results:
+        logger.log(format_result(result))
+    return 0 if all(result["ok"] for result in results) else 1
+
 if __name__ == "__main__":
-    exit(main()) 
\ No newline at end of file
+    exit(main(*sys.argv[1:]))
@@ -34,6 +34,8 @@ def test_convert():
     print(f"to_list('1,2,3,4,5', converter='int') = {to_list('1,2,3,4,5', converter='int')}")
     print(f"to_list('1.1,2.2,3.3', converter='float') = {to_list('1.1,2.2,3.3', converter='float')}")
     print(f"to_list('true,false,1,0', converter='bool') = {to_list('true,false,1,0', converter='bool')}")
+    quoted = 'a,"b,c",d\\,e'
+    print(f"to_list({quoted!r}) = {to_list(quoted)}")
     print()
 
     # 测试字典转换
@@ -42,6 +44,8 @@ def test_convert():
     print(f"to_dict('a:1,b:2,c:3', converter='int') = {to_dict('a:1,b:2,c:3', converter='int')}")
     print(f"to_dict('a:1.1,b:2.2,c:3.3', converter='float') = {to_dict('a:1.1,b:2.2,c:3.3', converter='float')}")
     print(f"to_dict('a:true,b:false,c:1', converter='bool') = {to_dict('a:true,b:false,c:1', converter='bool')}")
+    nested = '{url:"http://x",tags:[a,b]}'
+    print(f"to_dict({nested!r}) = {to_dict(nested)}")
     print()
 
     # 测试进制转换
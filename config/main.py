@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+# Resident action daemon (main.py --daemon / --remote): Unix socket it
+# listens on, number of actions run at once, and seconds without any
+# request after which it exits (0 keeps it running). The socket's
+# directory must belong to the user and be private (0700); it defaults to
+# $XDG_RUNTIME_DIR, else a per-user directory under the temp dir.
+DAEMON_SOCKET = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(), f"pycake-{os.getuid()}"),
+    "pycake.sock"
+)
+DAEMON_WORKERS = 8
+DAEMON_IDLE_TIMEOUT = 600
+
+# Batch mode (main.py --batch): default pool running the jobs, "thread"
+# for I/O-bound actions such as svn commands or "process" for CPU-bound
+# ones, and number of jobs run at once
+BATCH_POOL = "thread"
+BATCH_WORKERS = 8
+
+# Profiling (main.py --profile=cpu|mem|wall, SIGUSR1 or POST /admin/profile
+# on the web server): directory receiving the reports, number of entries
+# in the printed summaries, sampling interval of the wall-clock profiler
+# in seconds, traceback depth recorded by tracemalloc, and the mode
+# toggled by SIGUSR1
+PROFILE_DIR = "profiles"
+PROFILE_TOP = 30
+PROFILE_WALL_INTERVAL = 0.005
+PROFILE_MEM_FRAMES = 10
+PROFILE_SIGNAL_MODE = "cpu"
+
+# Log files written by utils.logger: "text" lines, or "json" lines carrying run id, stage and duration (and an
+# index used by utils.logger.read_run to find a run's entries)
+LOG_FORMAT = "text"
+
+# Rotate the log file once it reaches this size in bytes, or is older than
+# this many seconds (0 disables either); rotated files are gzipped in the
+# background and the newest LOG_BACKUP_COUNT are kept
+LOG_MAX_BYTES = 100 * 1024 * 1024
+LOG_ROTATE_INTERVAL = 0
+LOG_BACKUP_COUNT = 10
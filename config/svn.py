@@ -2,5 +2,61 @@
 A_REPO_PATH = "/path/to/svn/repo/A"
 B_REPO_PATH = "/path/to/svn/repo/B"
 
+# Mirror pairs to sync. Each entry needs "name", "source" and "target"
+# and may set "paths" (default paths to sync), "interval" (seconds between
+# scheduled runs) and "mode": "wc" (default) when source and target are
+# working copies, "url" to mirror repository URLs directly with svnmucc.
+# SYNC_PAIRS_FILE, a JSON file holding such a list (or {"pairs": [...]}),
+# takes precedence when it exists; with neither, the single
+# A_REPO_PATH -> B_REPO_PATH pair is used.
+SYNC_PAIRS = []
+SYNC_PAIRS_FILE = "sync_pairs.json"
+
+# Number of pairs synced at once, and where per-working-copy lock files live
+SYNC_MAX_PARALLEL_PAIRS = 4
+SYNC_LOCK_DIR = ".sync_locks"
+
+# Watch mode (action.svn_sync --watch): seconds of quiet before syncing a
+# burst of changes, upper bound on that wait, polling interval when inotify
+# is unavailable, and seconds between `svn info -r HEAD` checks on the
+# source (0 disables revision polling)
+SYNC_WATCH_DEBOUNCE = 1.0
+SYNC_WATCH_MAX_DELAY = 10.0
+SYNC_WATCH_POLL_INTERVAL = 2.0
+SYNC_REVISION_POLL_INTERVAL = 0
+
+# URL-to-URL sync (pairs with "mode": "url"): SQLite file remembering the
+# last mirrored source revision, and the number of changed files under one
+# path above which content is fetched with one `svn export` instead of
+# one `svn cat` per file
+URL_SYNC_STATE_DB = "url_sync_state.db"
+URL_SYNC_EXPORT_THRESHOLD = 200
+
+# Maximum number of paths per `svn add/delete --targets` call during sync
+SVN_TARGETS_CHUNK = 1000
+
+# Number of threads copying files during sync
+SYNC_COPY_WORKERS = 8
+
+# Number of sync stages (repo updates, path copies) allowed to run at once
+SYNC_STAGE_WORKERS = 4
+
+# Seconds before an svn command run during sync is killed
+SYNC_COMMAND_TIMEOUT = 3600
+
+# Directory receiving a Chrome trace-event JSON file per sync run
+# (sync-<run id>.json, viewable in chrome://tracing or Perfetto); empty: off
+SYNC_TRACE_DIR = ""
+
+# SQLite manifest of file size/mtime/inode/hash kept between sync runs
+SYNC_MANIFEST_DB = "sync_manifest.db"
+
+# Batch SVN operations (svn.status_many / svn.update_many)
+SVN_MAX_WORKERS = 8
+SVN_COMMAND_TIMEOUT = 600
+
+# Local SQLite cache of svn log history (svn.log_cached / svn.search_log)
+SVN_LOG_CACHE_DB = "svn_log_cache.db"
+
 # Log file configuration
-LOG_FILE = "sync.log" 
\ No newline at end of file
+LOG_FILE = "sync.log"
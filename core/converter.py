@@ -1,7 +1,215 @@
 import re
-from typing import Any, Optional, List, Dict, Tuple, Callable
+from functools import lru_cache
+from typing import Any, Optional, List, Dict, Tuple, Callable, Iterable, Iterator
 from datetime import datetime, date, time
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+
+# 需要逐字符扫描的特殊字符：转义、引号与括号
+_SPECIAL_CHARS = '\\"\'[]{}()'
+_BRACKETS = {'[': ']', '{': '}', '(': ')'}
+_QUOTES = ('"', "'")
+
+
+@lru_cache(maxsize=64)
+def _scanner(sep: str, kv_sep: Optional[str] = None) -> re.Pattern:
+    """
+    为分隔符编译扫描用的正则（按分隔符缓存）
+    :param sep: 项分隔符
+    :param kv_sep: 键值分隔符（可选）
+    :return: 预编译的正则
+    """
+    alternatives = [r'\\.', r'["\'\[\]{}()]', re.escape(sep)]
+    if kv_sep:
+        alternatives.append(re.escape(kv_sep))
+    return re.compile('|'.join(alternatives), re.S)
+
+
+def _finish(buf: List[str], lo: Optional[int], hi: Optional[int]) -> str:
+    """
+    拼接当前项并去除首尾空白（引号或转义得到的字面字符不会被去除）
+    """
+    text = ''.join(buf)
+    if lo is None:
+        return text.strip()
+    return text[:lo].lstrip() + text[lo:hi] + text[hi:].rstrip()
+
+
+def _scan(value: str, sep: str, kv_sep: Optional[str] = None) -> Iterable[Any]:
+    """
+    单次扫描切分字符串
+    支持引号（'...' 或 "..."）、反斜杠转义，以及括号嵌套。引号和括号只在项（或值）的开头生效，
+    括号内的分隔符不切分，内容原样保留，交给元素转换函数继续解析
+    :param value: 要切分的字符串
+    :param sep: 项分隔符
+    :param kv_sep: 键值分隔符，提供时产出 (key, value) 元组，缺少键值分隔符的项被忽略
+    :return: 可迭代的切分结果
+    """
+    if any(ch in value for ch in _SPECIAL_CHARS):
+        return _scan_quoted(value, sep, kv_sep)
+    # 快速路径：没有引号、转义和括号时直接交给 C 实现的 split/strip
+    if kv_sep is None:
+        return [item.strip() for item in value.split(sep)]
+    return [(key.strip(), val.strip())
+            for key, found, val in (item.partition(kv_sep) for item in value.split(sep))
+            if found]
+
+
+def _scan_quoted(value: str, sep: str, kv_sep: Optional[str]) -> Iterator[Any]:
+    """
+    _scan 的完整扫描实现，按预编译正则在特殊字符之间跳跃
+    """
+    buf: List[str] = []
+    size = 0
+    lo = hi = None      # 字面量区间（引号内容和转义字符），不参与首尾去空白
+    blank = True        # 当前项目前是否只有空白
+    key = None
+    quote = None
+    stack: List[str] = []
+    pos = 0
+    for match in _scanner(sep, kv_sep).finditer(value):
+        token = match.group()
+        start = match.start()
+        if start > pos:
+            chunk = value[pos:start]
+            buf.append(chunk)
+            size += len(chunk)
+            if quote and not stack:
+                hi = size
+            elif blank and chunk.strip():
+                blank = False
+        pos = match.end()
+
+        if stack:
+            # 括号内原样保留，仅跟踪引号和括号层级
+            buf.append(token)
+            size += len(token)
+            if quote:
+                if token == quote:
+                    quote = None
+            elif token in _QUOTES:
+                quote = token
+            elif token in _BRACKETS:
+                stack.append(_BRACKETS[token])
+            elif token == stack[-1]:
+                stack.pop()
+            continue
+
+        if len(token) == 2 and token[0] == '\\':
+            # 转义字符按字面量处理
+            if lo is None:
+                lo = size
+            buf.append(token[1])
+            size += 1
+            hi = size
+            blank = False
+        elif quote:
+            if token == quote:
+                quote = None
+            else:
+                buf.append(token)
+                size += len(token)
+                hi = size
+        elif token == sep:
+            if kv_sep is None:
+                yield _finish(buf, lo, hi)
+            elif key is not None:
+                yield key, _finish(buf, lo, hi)
+            buf, size, lo, hi, blank, key = [], 0, None, None, True, None
+        elif token == kv_sep and key is None:
+            key = _finish(buf, lo, hi)
+            buf, size, lo, hi, blank = [], 0, None, None, True
+        elif blank and token in _QUOTES:
+            quote = token
+            if lo is None:
+                lo = size
+            hi = size
+            blank = False
+        else:
+            if blank and token in _BRACKETS:
+                stack.append(_BRACKETS[token])
+            buf.append(token)
+            size += len(token)
+            blank = False
+
+    if pos < len(value):
+        buf.append(value[pos:])
+        size += len(value) - pos
+        if quote and not stack:
+            hi = size
+    if kv_sep is None:
+        yield _finish(buf, lo, hi)
+    elif key is not None:
+        yield key, _finish(buf, lo, hi)
+
+
+def _unwrap(value: str, pairs: str) -> str:
+    """
+    去除包裹整个字符串的一层括号，例如 '[1,2]' -> '1,2'
+    :param value: 字符串
+    :param pairs: 允许去除的左括号集合
+    :return: 去除括号后的字符串，没有可去除的括号时返回 value 本身
+    """
+    if value[0].isspace() or value[-1].isspace():
+        text = value.strip()
+    else:
+        text = value
+    if len(text) < 2 or text[0] not in pairs or text[-1] != _BRACKETS[text[0]]:
+        return value
+    depth = 0
+    quote = None
+    escaped = False
+    for i, ch in enumerate(text):
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif quote:
+            if ch == quote:
+                quote = None
+        elif ch in _QUOTES:
+            quote = ch
+        elif ch in _BRACKETS:
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+            if depth == 0 and i != len(text) - 1:
+                return value
+    return text[1:-1]
+
+
+# 批量转换的预检查正则，与 int()/float()/Decimal() 接受的格式保持一致（允许首尾空白和数字间下划线）
+_DIGITS = r'\d(?:_?\d)*'
+_NUMBER = rf'(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:[eE][+-]?{_DIGITS})?'
+_INT_RE = re.compile(rf'\s*[+-]?{_DIGITS}\s*')
+_FLOAT_RE = re.compile(rf'\s*[+-]?(?:{_NUMBER}|inf|infinity|nan)\s*', re.IGNORECASE)
+_DECIMAL_RE = re.compile(rf'\s*[+-]?(?:{_NUMBER}|inf|infinity|s?nan\d*)\s*', re.IGNORECASE)
+_HEX_RE = re.compile(r'\s*[+-]?(?:0[xX]_?)?[0-9a-fA-F](?:_?[0-9a-fA-F])*\s*')
+_BINARY_RE = re.compile(r'\s*[+-]?(?:0[bB]_?)?[01](?:_?[01])*\s*')
+_OCTAL_RE = re.compile(r'\s*[+-]?(?:0[oO]_?)?[0-7](?:_?[0-7])*\s*')
+# convert_many 中表示查找失败（default 本身可能就是 True/False）
+_MISSING = object()
+_BOOL_VALUES = {
+    'true': True, 'yes': True, '1': True, 'on': True,
+    'false': False, 'no': False, '0': False, 'off': False,
+}
+
+
+def _is_plain_number(value: str) -> bool:
+    """
+    字符类快速检查：纯数字或只含一个小数点的数字
+    """
+    return value.isdecimal() or value.replace('.', '', 1).isdecimal()
+
+
+# 类型名 -> (字符类快速检查, 正则检查, 转换函数)
+_VALIDATORS: Dict[str, Tuple[Optional[Callable[[str], bool]], Callable[[str], Any], Callable[[str], Any]]] = {
+    'int': (str.isdecimal, _INT_RE.fullmatch, int),
+    'float': (_is_plain_number, _FLOAT_RE.fullmatch, float),
+    'decimal': (_is_plain_number, _DECIMAL_RE.fullmatch, Decimal),
+    'hex': (None, _HEX_RE.fullmatch, lambda v: int(v, 16)),
+    'binary': (None, _BINARY_RE.fullmatch, lambda v: int(v, 2)),
+    'octal': (None, _OCTAL_RE.fullmatch, lambda v: int(v, 8)),
+}
 
 class Converter:
     @staticmethod
@@ -102,6 +310,53 @@ class Converter:
         except (ValueError, TypeError):
             return default
 
+    @staticmethod
+    def iter_list(value: str, sep: str = ',',
+                  converter: Optional[Callable] = None) -> Iterator[Any]:
+        """
+        将字符串逐项切分为迭代器
+        支持引号和反斜杠转义（例如 'a,"b,c",d\\,e'），以及括号嵌套（例如 '[1,2],[3,4]'）
+        :param value: 要转换的字符串
+        :param sep: 分隔符
+        :param converter: 元素转换函数
+        :return: 元素迭代器
+        """
+        if not value:
+            return iter(())
+
+        body = _unwrap(value, '[(')
+        if body is not value and not body.strip():
+            # 空括号，例如 '[]'、'()'
+            return iter(())
+
+        items = iter(_scan(body, sep))
+        if converter:
+            return map(converter, items)
+        return items
+
+    @staticmethod
+    def iter_dict(value: str, item_sep: str = ',', kv_sep: str = ':',
+                  converter: Optional[Callable] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        将字符串逐项切分为 (键, 值) 迭代器
+        :param value: 要转换的字符串
+        :param item_sep: 项分隔符
+        :param kv_sep: 键值分隔符
+        :param converter: 值转换函数
+        :return: (键, 值) 迭代器
+        """
+        if not value:
+            return iter(())
+
+        body = _unwrap(value, '{')
+        if body is not value and not body.strip():
+            return iter(())
+
+        pairs = iter(_scan(body, item_sep, kv_sep))
+        if converter:
+            return ((key, converter(val)) for key, val in pairs)
+        return pairs
+
     @staticmethod
     def to_list(value: str, sep: str = ',', 
                converter: Optional[Callable] = None) -> List[Any]:
@@ -109,16 +364,21 @@ class Converter:
         将字符串转换为列表
         :param value: 要转换的字符串
         :param sep: 分隔符
-        :param converter: 元素转换函数
+        :param converter: 元素转换函数（可以是 Converter.to_dict 等，用于解析嵌套结构）
         :return: 转换后的列表
         """
         if not value:
             return []
-        
-        items = [item.strip() for item in value.split(sep)]
+
+        body = _unwrap(value, '[(')
+        if body is not value and not body.strip():
+            # 空括号，例如 '[]'、'()'
+            return []
+
+        items = _scan(body, sep)
         if converter:
             return [converter(item) for item in items]
-        return items
+        return items if isinstance(items, list) else list(items)
 
     @staticmethod
     def to_dict(value: str, item_sep: str = ',', 
@@ -133,18 +393,15 @@ class Converter:
         """
         if not value:
             return {}
-        
-        result = {}
-        for item in value.split(item_sep):
-            if kv_sep not in item:
-                continue
-            key, val = item.split(kv_sep, 1)
-            key = key.strip()
-            val = val.strip()
-            if converter:
-                val = converter(val)
-            result[key] = val
-        return result
+
+        body = _unwrap(value, '{')
+        if body is not value and not body.strip():
+            return {}
+
+        pairs = _scan(body, item_sep, kv_sep)
+        if converter:
+            return {key: converter(val) for key, val in pairs}
+        return dict(pairs)
 
     @staticmethod
     def to_tuple(value: str, sep: str = ',', 
@@ -156,13 +413,7 @@ class Converter:
         :param converter: 元素转换函数
         :return: 转换后的元组
         """
-        if not value:
-            return tuple()
-        
-        items = [item.strip() for item in value.split(sep)]
-        if converter:
-            return tuple(converter(item) for item in items)
-        return tuple(items)
+        return tuple(Converter.iter_list(value, sep, converter))
 
     @staticmethod
     def to_set(value: str, sep: str = ',', 
@@ -174,13 +425,7 @@ class Converter:
         :param converter: 元素转换函数
         :return: 转换后的集合
         """
-        if not value:
-            return set()
-        
-        items = [item.strip() for item in value.split(sep)]
-        if converter:
-            return {converter(item) for item in items}
-        return set(items)
+        return set(Converter.iter_list(value, sep, converter))
 
     @staticmethod
     def to_bytes(value: str, encoding: str = 'utf-8', 
@@ -234,4 +479,60 @@ class Converter:
         try:
             return int(value, 8)
         except (ValueError, TypeError):
-            return default 
\ No newline at end of file
+            return default 
+
+    @staticmethod
+    def is_valid(value: str, kind: str) -> bool:
+        """
+        不抛出异常地预检查字符串能否转换为指定类型
+        :param value: 要检查的字符串
+        :param kind: 目标类型（int/float/decimal/bool/hex/binary/octal）
+        :return: 是否可以转换
+        """
+        if not isinstance(value, str):
+            return False
+        if kind == 'bool':
+            return value.lower() in _BOOL_VALUES
+        if kind not in _VALIDATORS:
+            raise ValueError(f"Unsupported kind: {kind}")
+        fast, check, _ = _VALIDATORS[kind]
+        return bool(fast and fast(value)) or check(value) is not None
+
+    @staticmethod
+    def convert_many(values: Iterable[str], kind: str,
+                     default: Any = None) -> Tuple[List[Any], List[int]]:
+        """
+        批量转换字符串，先用字符类和预编译正则检查再转换，无效值不经过异常处理
+        :param values: 要转换的字符串序列
+        :param kind: 目标类型（int/float/decimal/bool/hex/binary/octal）
+        :param default: 无效值对应位置的结果
+        :return: (结果列表, 转换失败的下标列表)
+        """
+        results: List[Any] = []
+        errors: List[int] = []
+        append = results.append
+
+        if kind == 'bool':
+            lookup = _BOOL_VALUES.get
+            for index, value in enumerate(values):
+                result = lookup(value.lower(), _MISSING) if isinstance(value, str) else _MISSING
+                if result is _MISSING:
+                    errors.append(index)
+                    result = default
+                append(result)
+            return results, errors
+
+        if kind not in _VALIDATORS:
+            raise ValueError(f"Unsupported kind: {kind}")
+        fast, check, convert = _VALIDATORS[kind]
+        for index, value in enumerate(values):
+            if isinstance(value, str) and ((fast and fast(value)) or check(value)):
+                # 格式正确时仍可能失败，例如超过 int 的位数限制
+                try:
+                    append(convert(value))
+                    continue
+                except (ValueError, TypeError, InvalidOperation):
+                    pass
+            errors.append(index)
+            append(default)
+        return results, errors
\ No newline at end of file
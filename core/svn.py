@@ -1,58 +1,353 @@
 import os
+import re
+import copy
 import sys
+import shutil
 import subprocess
+import tempfile
+import threading
 import xml.etree.ElementTree as ET
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
+from typing import List, Optional, Dict, Any, Tuple, Callable, Iterable, Iterator
 from pathlib import Path
+from utils.tracing import span
+
+# 功能名 -> 所需的最低 SVN 版本
+CAPABILITIES = {
+    'log-search': (1, 8),   # svn log --search
+    'show-item': (1, 9),    # svn info --show-item
+    'shelve': (1, 10),      # svn shelve
+}
+
+# 统一差异格式的块头，例如 "@@ -1,3 +1,4 @@"
+_HUNK_RE = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+class SVNCommandError(subprocess.CalledProcessError):
+    """SVN 命令以非零状态退出，消息中包含命令的错误输出（命令中不含认证信息）"""
+
+    def __str__(self) -> str:
+        message = super().__str__().rstrip('.')
+        detail = (self.stderr or '').strip()
+        return f"{message}: {detail}" if detail else message
+
+@lru_cache(maxsize=None)
+def probe_svn(binary: str = 'svn') -> Dict[str, Any]:
+    """
+    解析 svn 可执行文件路径并检测版本，结果在进程内缓存，只会执行一次 svn --version
+    :param binary: svn 命令名或路径
+    :return: 包含 path/version/version_info/capabilities 的字典
+    """
+    path = shutil.which(binary)
+    if path is None:
+        raise RuntimeError("SVN is not installed or not in PATH")
+    try:
+        result = subprocess.run([path, '--version', '--quiet'],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                text=True,
+                                check=True)
+    except (subprocess.SubprocessError, OSError):
+        raise RuntimeError("SVN is not installed or not in PATH")
+
+    version = result.stdout.strip()
+    version_info = tuple(int(part) for part in re.findall(r'\d+', version)[:3])
+    return {
+        'path': path,
+        'version': version,
+        'version_info': version_info,
+        'capabilities': frozenset(name for name, minimum in CAPABILITIES.items()
+                                  if version_info >= minimum)
+    }
+
+def _find_wc_db(path: str) -> Optional[str]:
+    """
+    向上查找路径所在工作副本的 .svn/wc.db
+    :param path: 本地路径
+    :return: wc.db 路径，不在工作副本中时返回 None
+    """
+    current = os.path.abspath(path)
+    if not os.path.isdir(current):
+        current = os.path.dirname(current)
+    while True:
+        candidate = os.path.join(current, '.svn', 'wc.db')
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+def _path_stamp(path: str) -> Tuple[int, int, int]:
+    """
+    获取文件的 mtime/大小/inode，作为检测本地修改的廉价指纹
+    :param path: 本地路径
+    :return: 指纹元组
+    """
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+_clients: Dict[Tuple[Optional[str], Optional[str], str], 'SVNClient'] = {}
+_clients_lock = threading.Lock()
+
+def get_client(username: Optional[str] = None, password: Optional[str] = None,
+               binary: str = 'svn') -> 'SVNClient':
+    """
+    获取进程内共享的 SVN 客户端（按认证信息区分）
+    :param username: SVN 用户名
+    :param password: SVN 密码
+    :param binary: svn 命令名或路径
+    :return: SVN 客户端
+    """
+    key = (username, password, binary)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = SVNClient(username, password, binary)
+        return client
 
 class SVNClient:
-    def __init__(self, username: Optional[str] = None, password: Optional[str] = None):
+    def __init__(self, username: Optional[str] = None, password: Optional[str] = None,
+                 binary: str = 'svn', timeout: Optional[float] = None, cache_size: int = 0):
         """
         初始化 SVN 客户端
         :param username: SVN 用户名
         :param password: SVN 密码
+        :param binary: svn 命令名或路径
+        :param timeout: 单个 svn 子进程的默认超时时间（秒），None 表示不限制
+        :param cache_size: info/status/diff 结果缓存的最大条目数，0 表示不缓存（status/diff 只缓存文件）
         """
         self.username = username
         self.password = password
+        self.binary = binary
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: 'OrderedDict[tuple, Any]' = OrderedDict()
+        self._cache_lock = threading.Lock()
         self._check_svn_installed()
 
     def _check_svn_installed(self) -> None:
         """
-        检查 SVN 是否已安装
+        检查 SVN 是否已安装（使用进程内缓存的探测结果）
         """
-        try:
-            subprocess.run(['svn', '--version'], 
-                         stdout=subprocess.PIPE, 
-                         stderr=subprocess.PIPE, 
-                         check=True)
-        except (subprocess.SubprocessError, FileNotFoundError):
-            raise RuntimeError("SVN is not installed or not in PATH")
+        self.svn = probe_svn(self.binary)
+
+    @property
+    def version(self) -> Tuple[int, ...]:
+        """SVN 版本号元组"""
+        return self.svn['version_info']
+
+    def has_capability(self, name: str) -> bool:
+        """
+        检查当前 SVN 版本是否支持某个功能
+        :param name: 功能名（见 CAPABILITIES）
+        :return: 是否支持
+        """
+        return name in self.svn['capabilities']
 
-    def _run_command(self, command: List[str], cwd: Optional[str] = None) -> tuple:
+    def _build_command(self, command: List[str]) -> List[str]:
+        """
+        补全 SVN 命令：认证信息、非交互式标志和已解析的 svn 路径
+        :param command: 命令列表
+        :return: 补全后的命令列表
+        """
+        # 添加认证信息
+        if self.username and self.password:
+            command.extend(['--username', self.username, '--password', self.password])
+
+        # 添加非交互式标志
+        command.extend(['--non-interactive'])
+
+        # 使用已解析的 svn 路径，避免每次在 PATH 中查找
+        if command[0] == 'svn':
+            command[0] = self.svn['path']
+        return command
+
+    def _iter_xml(self, command: List[str], tag: str,
+                  parse_entry: Callable[[ET.Element], Any],
+                  cwd: Optional[str] = None) -> Iterator[Any]:
+        """
+        流式执行输出 XML 的 SVN 命令，边读取管道边解析，逐个产出条目
+        已处理的元素会从树中移除，内存占用与输出大小无关
+        :param command: 命令列表
+        :param tag: 条目元素的标签名
+        :param parse_entry: 条目解析函数
+        :param cwd: 工作目录
+        :return: 条目迭代器
+        :raises SVNCommandError: 命令失败（已产出的条目仍然有效）
+        :raises ET.ParseError: 命令成功但输出无法解析
+        """
+        # _build_command 会原地追加认证信息，异常中只记录补全前的命令
+        argv = list(command)
+        # stderr 写入临时文件，失败时随异常返回，且不会因管道写满阻塞命令
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(self._build_command(command),
+                                       cwd=cwd,
+                                       stdout=subprocess.PIPE,
+                                       stderr=stderr)
+            parser = ET.XMLPullParser(events=('start', 'end'))
+            stack: List[ET.Element] = []
+            try:
+                try:
+                    for chunk in iter(partial(process.stdout.read1, 65536), b''):
+                        parser.feed(chunk)
+                        for event, elem in parser.read_events():
+                            if event == 'start':
+                                stack.append(elem)
+                                continue
+                            stack.pop()
+                            if elem.tag == tag:
+                                yield parse_entry(elem)
+                                if stack:
+                                    stack[-1].remove(elem)
+                    parser.close()
+                except ET.ParseError:
+                    # 命令失败时输出通常不完整，优先报告命令错误
+                    if process.wait() == 0:
+                        raise
+                if process.wait() != 0:
+                    stderr.seek(0)
+                    raise SVNCommandError(
+                        process.returncode, argv,
+                        stderr=stderr.read().decode('utf-8', errors='replace'))
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+                process.wait()
+
+    def _cached(self, kind: str, args: tuple, path: str, tree: bool,
+                compute: Callable[..., Any]) -> Any:
+        """
+        带缓存地执行只读查询
+        缓存键由查询参数、工作副本 wc.db 的 mtime/大小（随 update/commit 等操作变化）以及
+        可选的目标文件 mtime/大小/inode（检测未提交的本地修改）组成，不在工作副本中的路径不缓存
+        目录内文件的修改无法廉价地检测，因此依赖本地修改的查询（tree）只对文件缓存，目录每次都重新执行
+        compute 返回 None 表示失败，不会被缓存
+        :param kind: 查询类型
+        :param args: 查询参数
+        :param path: 查询的本地路径
+        :param tree: 结果是否依赖未提交的本地修改
+        :param compute: 实际执行查询的函数
+        :return: 查询结果的副本
+        """
+        if not self.cache_size:
+            return compute(*args)
+        wc_db = _find_wc_db(path) if os.path.exists(path) else None
+        if wc_db is None or (tree and os.path.isdir(path)):
+            return compute(*args)
+        st = os.stat(wc_db)
+        fingerprint = (st.st_mtime_ns, st.st_size, _path_stamp(path) if tree else None)
+        key = (kind, args, fingerprint)
+
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return copy.deepcopy(self._cache[key])
+            self.cache_misses += 1
+
+        result = compute(*args)
+        if result is not None:
+            with self._cache_lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return copy.deepcopy(result)
+
+    def clear_cache(self) -> None:
+        """清空结果缓存"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        获取结果缓存统计
+        :return: 命中数、未命中数、当前条目数和容量
+        """
+        with self._cache_lock:
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'size': len(self._cache),
+                'capacity': self.cache_size
+            }
+
+    @staticmethod
+    def _workdir(path: str) -> Optional[str]:
+        """
+        只读命令的工作目录：本地目录直接使用，文件或 URL 使用当前目录
+        """
+        return path if os.path.isdir(path) else None
+
+    def _run_command(self, command: List[str], cwd: Optional[str] = None,
+                     timeout: Optional[float] = None) -> tuple:
         """
         执行 SVN 命令
         :param command: 命令列表
         :param cwd: 工作目录
+        :param timeout: 超时时间（秒），默认使用客户端的 timeout
         :return: (成功标志, 输出内容)
         """
-        try:
-            # 添加认证信息
-            if self.username and self.password:
-                command.extend(['--username', self.username, '--password', self.password])
-            
-            # 添加非交互式标志
-            command.extend(['--non-interactive'])
-            
-            # 执行命令
-            result = subprocess.run(command,
-                                  cwd=cwd,
-                                  stdout=subprocess.PIPE,
-                                  stderr=subprocess.PIPE,
-                                  text=True,
-                                  check=True)
-            return True, result.stdout
-        except subprocess.CalledProcessError as e:
-            return False, e.stderr
+        if timeout is None:
+            timeout = self.timeout
+        with span(f"svn {command[1]}", cwd=cwd) as command_span:
+            try:
+                command = self._build_command(command)
+
+                # 执行命令
+                result = subprocess.run(command,
+                                      cwd=cwd,
+                                      stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE,
+                                      text=True,
+                                      timeout=timeout,
+                                      check=True)
+                return True, result.stdout
+            except subprocess.CalledProcessError as e:
+                command_span.set(returncode=e.returncode)
+                return False, e.stderr
+            except subprocess.TimeoutExpired:
+                command_span.set(timed_out=True)
+                return False, f"Command timed out after {timeout} seconds"
+
+    def _run_many(self, task: Callable[[str], Any], targets: Iterable[str],
+                  max_workers: int) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """
+        在有界线程池中对多个目标执行任务，按完成顺序产出结果
+        :param task: 针对单个目标的任务，失败时抛出异常
+        :param targets: 目标列表
+        :param max_workers: 最大并发数
+        :return: (目标, 结果, 错误信息) 迭代器，成功时错误信息为 None
+        """
+        targets = list(targets)
+        if not targets:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as executor:
+            futures = {executor.submit(task, target): target for target in targets}
+            for future in as_completed(futures):
+                target = futures[future]
+                try:
+                    yield target, future.result(), None
+                except Exception as e:
+                    yield target, None, str(e)
+
+    def _run_checked(self, command: List[str], cwd: Optional[str] = None,
+                     timeout: Optional[float] = None) -> str:
+        """
+        执行 SVN 命令，失败时抛出 RuntimeError
+        :param command: 命令列表
+        :param cwd: 工作目录
+        :param timeout: 超时时间（秒）
+        :return: 输出内容
+        """
+        success, output = self._run_command(command, cwd=cwd, timeout=timeout)
+        if not success:
+            raise RuntimeError(output.strip())
+        return output
 
     def checkout(self, url: str, path: str, revision: Optional[int] = None) -> bool:
         """
@@ -66,6 +361,7 @@ class SVNClient:
         if revision:
             command.extend(['-r', str(revision)])
         success, _ = self._run_command(command)
+        self.clear_cache()
         return success
 
     def update(self, path: str, revision: Optional[int] = None) -> bool:
@@ -79,6 +375,7 @@ class SVNClient:
         if revision:
             command.extend(['-r', str(revision)])
         success, _ = self._run_command(command, cwd=path)
+        self.clear_cache()
         return success
 
     def commit(self, path: str, message: str) -> bool:
@@ -90,6 +387,7 @@ class SVNClient:
         """
         command = ['svn', 'commit', '-m', message, path]
         success, _ = self._run_command(command, cwd=path)
+        self.clear_cache()
         return success
 
     def add(self, path: str) -> bool:
@@ -100,6 +398,7 @@ class SVNClient:
         """
         command = ['svn', 'add', path]
         success, _ = self._run_command(command, cwd=os.path.dirname(path))
+        self.clear_cache()
         return success
 
     def delete(self, path: str) -> bool:
@@ -110,59 +409,106 @@ class SVNClient:
         """
         command = ['svn', 'delete', path]
         success, _ = self._run_command(command, cwd=os.path.dirname(path))
+        self.clear_cache()
         return success
 
     def status(self, path: str) -> List[Dict[str, Any]]:
         """
-        获取文件状态
+        获取文件状态（启用缓存时文件及工作副本未变化则直接返回缓存结果，目录不缓存）
         :param path: 路径
-        :return: 状态列表
+        :return: 状态列表，失败时返回空列表
+        """
+        return self._cached('status', (path,), path, True, self._status) or []
+
+    def _status(self, path: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        执行 svn status 并解析结果，失败时返回 None
         """
         command = ['svn', 'status', '--xml', path]
-        success, output = self._run_command(command, cwd=path)
+        success, output = self._run_command(command, cwd=self._workdir(path))
         if not success:
-            return []
+            return None
 
         try:
-            root = ET.fromstring(output)
-            status_list = []
-            for entry in root.findall('.//entry'):
-                status_list.append({
-                    'path': entry.get('path'),
-                    'status': entry.find('wc-status').get('item'),
-                    'revision': entry.find('wc-status').get('revision')
-                })
-            return status_list
+            return self._parse_status(output)
         except ET.ParseError:
-            return []
+            return None
 
-    def info(self, path: str) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _parse_status(output: str) -> List[Dict[str, Any]]:
+        """
+        解析 svn status --xml 输出
         """
-        获取文件信息
+        root = ET.fromstring(output)
+        return [SVNClient._status_entry(entry) for entry in root.iter('entry')]
+
+    @staticmethod
+    def _status_entry(entry: ET.Element) -> Dict[str, Any]:
+        """
+        解析 svn status --xml 中的单个 entry 元素
+        """
+        wc_status = entry.find('wc-status')
+        return {
+            'path': entry.get('path'),
+            'status': wc_status.get('item'),
+            'revision': wc_status.get('revision')
+        }
+
+    def iter_status(self, path: str) -> Iterator[Dict[str, Any]]:
+        """
+        流式获取文件状态，边读取边产出，适用于大型工作副本
         :param path: 路径
+        :return: 状态迭代器
+        """
+        return self._iter_xml(['svn', 'status', '--xml', path], 'entry', self._status_entry)
+
+    def info(self, path: str, revision: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        获取文件信息（启用缓存时工作副本未变化则直接返回缓存结果）
+        :param path: 路径或 URL
+        :param revision: 版本号（例如 'HEAD'，指定时会访问服务器，不使用缓存）
         :return: 文件信息
         """
+        if revision:
+            return self._info(path, revision)
+        return self._cached('info', (path,), path, False, self._info)
+
+    def _info(self, path: str, revision: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        执行 svn info 并解析结果
+        """
         command = ['svn', 'info', '--xml', path]
-        success, output = self._run_command(command, cwd=path)
+        if revision:
+            command.extend(['-r', str(revision)])
+        success, output = self._run_command(command, cwd=self._workdir(path))
         if not success:
             return None
 
         try:
-            root = ET.fromstring(output)
-            entry = root.find('entry')
-            if entry is None:
-                return None
-
-            return {
-                'url': entry.find('url').text,
-                'revision': entry.get('revision'),
-                'last_changed_rev': entry.find('commit').get('revision'),
-                'last_changed_date': entry.find('commit/date').text,
-                'last_changed_author': entry.find('commit/author').text
-            }
+            return self._parse_info(output)
         except (ET.ParseError, AttributeError):
             return None
 
+    @staticmethod
+    def _parse_info(output: str) -> Optional[Dict[str, Any]]:
+        """
+        解析 svn info --xml 输出
+        """
+        root = ET.fromstring(output)
+        entry = root.find('entry')
+        if entry is None:
+            return None
+
+        return {
+            'url': entry.find('url').text,
+            'revision': entry.get('revision'),
+            'last_changed_rev': entry.find('commit').get('revision'),
+            'last_changed_date': entry.find('commit/date').text,
+            'last_changed_author': entry.find('commit/author').text,
+            'repository_root': entry.findtext('repository/root'),
+            'uuid': entry.findtext('repository/uuid')
+        }
+
     def log(self, path: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         获取提交日志
@@ -171,41 +517,206 @@ class SVNClient:
         :return: 日志列表
         """
         command = ['svn', 'log', '--xml', '--limit', str(limit), path]
-        success, output = self._run_command(command, cwd=path)
+        success, output = self._run_command(command, cwd=self._workdir(path))
         if not success:
             return []
 
         try:
-            root = ET.fromstring(output)
-            log_list = []
-            for logentry in root.findall('logentry'):
-                log_list.append({
-                    'revision': logentry.get('revision'),
-                    'author': logentry.find('author').text,
-                    'date': logentry.find('date').text,
-                    'message': logentry.find('msg').text
-                })
-            return log_list
+            return self._parse_log(output)
         except (ET.ParseError, AttributeError):
             return []
 
+    @staticmethod
+    def _parse_log(output: str) -> List[Dict[str, Any]]:
+        """
+        解析 svn log --xml 输出
+        """
+        root = ET.fromstring(output)
+        return [SVNClient._log_entry(logentry) for logentry in root.findall('logentry')]
+
+    @staticmethod
+    def _log_entry(logentry: ET.Element) -> Dict[str, Any]:
+        """
+        解析 svn log --xml 中的单个 logentry 元素，包含 -v 输出的变更路径
+        """
+        entry = {
+            'revision': logentry.get('revision'),
+            'author': logentry.findtext('author'),
+            'date': logentry.findtext('date'),
+            'message': logentry.findtext('msg')
+        }
+        paths = logentry.find('paths')
+        if paths is not None:
+            entry['paths'] = [{
+                'path': item.text,
+                'action': item.get('action'),
+                'kind': item.get('kind'),
+                'copyfrom_path': item.get('copyfrom-path'),
+                'copyfrom_rev': item.get('copyfrom-rev')
+            } for item in paths.findall('path')]
+        return entry
+
+    def iter_log(self, path: str, limit: Optional[int] = None,
+                 revision: Optional[str] = None,
+                 verbose: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        流式获取提交日志，边读取边产出，适用于修订数量很大的仓库
+        :param path: 路径或 URL
+        :param limit: 日志数量限制
+        :param revision: 版本范围（例如 '100:HEAD'）
+        :param verbose: 是否包含变更路径
+        :return: 日志迭代器
+        """
+        command = ['svn', 'log', '--xml']
+        if verbose:
+            command.append('--verbose')
+        if limit:
+            command.extend(['--limit', str(limit)])
+        if revision:
+            command.extend(['-r', str(revision)])
+        command.append(path)
+        return self._iter_xml(command, 'logentry', self._log_entry)
+
     def diff(self, path: str, revision1: Optional[int] = None, revision2: Optional[int] = None) -> Optional[str]:
         """
-        获取文件差异
+        获取文件差异（启用缓存时文件及工作副本未变化则直接返回缓存结果，目录不缓存）
         :param path: 路径
         :param revision1: 起始版本
         :param revision2: 结束版本
         :return: 差异内容
         """
-        command = ['svn', 'diff', path]
-        if revision1 and revision2:
-            command.extend(['-r', f'{revision1}:{revision2}'])
-        elif revision1:
-            command.extend(['-r', str(revision1)])
-        
-        success, output = self._run_command(command, cwd=path)
+        return self._cached('diff', (path, revision1, revision2), path, True, self._diff)
+
+    def _diff(self, path: str, revision1: Optional[int] = None,
+              revision2: Optional[int] = None) -> Optional[str]:
+        """
+        执行 svn diff
+        """
+        command = ['svn', 'diff', path] + self._revision_range(revision1, revision2)
+        success, output = self._run_command(command, cwd=self._workdir(path))
         return output if success else None
 
+    @staticmethod
+    def _revision_range(revision1: Optional[int], revision2: Optional[int]) -> List[str]:
+        """
+        构造 diff 的 -r 参数
+        """
+        if revision1 and revision2:
+            return ['-r', f'{revision1}:{revision2}']
+        if revision1:
+            return ['-r', str(revision1)]
+        return []
+
+    def diff_summary(self, path: str, revision1: Optional[int] = None,
+                     revision2: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        获取变更文件摘要（svn diff --summarize --xml），不包含差异内容
+        :param path: 路径或 URL
+        :param revision1: 起始版本
+        :param revision2: 结束版本
+        :return: 变更列表，每项包含 path/kind/item（added/modified/deleted）/props
+        :raises RuntimeError: 命令失败（与没有变更的空列表区分）
+        """
+        command = ['svn', 'diff', '--summarize', '--xml', path] + self._revision_range(revision1, revision2)
+        output = self._run_checked(command, cwd=self._workdir(path))
+        root = ET.fromstring(output)
+        return [
+            {
+                'path': entry.text,
+                'kind': entry.get('kind'),
+                'item': entry.get('item'),
+                'props': entry.get('props'),
+            }
+            for entry in root.iter('path')
+        ]
+
+    def iter_diff(self, path: str, revision1: Optional[int] = None, revision2: Optional[int] = None,
+                  stats: bool = False, hunks: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        流式获取差异，边读取管道边解析，每读完一个文件产出一次
+        :param path: 路径或 URL
+        :param revision1: 起始版本
+        :param revision2: 结束版本
+        :param stats: 是否统计每个文件新增/删除的行数（added/removed）
+        :param hunks: 是否保留差异块内容，只需要统计时可关闭以节省内存
+        :return: 文件差异迭代器，每项包含 path/header/hunks（及 added/removed）
+        :raises SVNCommandError: 命令失败（已产出的条目仍然有效）
+        """
+        command = ['svn', 'diff', path] + self._revision_range(revision1, revision2)
+        argv = list(command)
+        # stderr 写入临时文件，失败时随异常返回
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(self._build_command(command),
+                                       cwd=self._workdir(path),
+                                       stdout=subprocess.PIPE,
+                                       stderr=stderr)
+            current: Optional[Dict[str, Any]] = None
+            hunk: Optional[Dict[str, Any]] = None
+            old_left = new_left = 0
+            try:
+                for raw in process.stdout:
+                    line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+
+                    # 差异块内的行按块头给出的行数归属，避免把 "--- " 开头的删除行误认为文件头
+                    if hunk is not None and (old_left > 0 or new_left > 0 or line.startswith('\\')):
+                        tag = line[:1]
+                        if tag == '-':
+                            old_left -= 1
+                            current['removed'] += 1
+                        elif tag == '+':
+                            new_left -= 1
+                            current['added'] += 1
+                        elif tag != '\\':
+                            old_left -= 1
+                            new_left -= 1
+                        if hunks:
+                            hunk['lines'].append(line)
+                        continue
+                    hunk = None
+
+                    if line.startswith('Index: '):
+                        if current is not None:
+                            yield self._finish_diff(current, stats)
+                        current = {'path': line[len('Index: '):], 'header': [], 'hunks': [],
+                                   'added': 0, 'removed': 0}
+                        continue
+                    if current is None:
+                        continue
+
+                    match = _HUNK_RE.match(line)
+                    if match:
+                        old_start, old_lines, new_start, new_lines = match.groups()
+                        old_left = int(old_lines) if old_lines is not None else 1
+                        new_left = int(new_lines) if new_lines is not None else 1
+                        hunk = {'header': line, 'old_start': int(old_start), 'old_lines': old_left,
+                                'new_start': int(new_start), 'new_lines': new_left, 'lines': []}
+                        if hunks:
+                            current['hunks'].append(hunk)
+                    else:
+                        current['header'].append(line)
+
+                if process.wait() != 0:
+                    stderr.seek(0)
+                    raise SVNCommandError(
+                        process.returncode, argv,
+                        stderr=stderr.read().decode('utf-8', errors='replace'))
+                if current is not None:
+                    yield self._finish_diff(current, stats)
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+                process.wait()
+
+    @staticmethod
+    def _finish_diff(entry: Dict[str, Any], stats: bool) -> Dict[str, Any]:
+        """
+        整理单个文件的差异结果，未要求统计时去掉行数
+        """
+        if not stats:
+            del entry['added'], entry['removed']
+        return entry
+
     def list(self, url: str) -> List[str]:
         """
         列出目录内容
@@ -223,6 +734,18 @@ class SVNClient:
         except ET.ParseError:
             return []
 
+    def iter_list(self, url: str, recursive: bool = False) -> Iterator[str]:
+        """
+        流式列出目录内容，边读取边产出
+        :param url: SVN 仓库地址
+        :param recursive: 是否递归列出
+        :return: 文件名迭代器
+        """
+        command = ['svn', 'list', '--xml', url]
+        if recursive:
+            command.append('--recursive')
+        return self._iter_xml(command, 'entry', lambda entry: entry.findtext('name'))
+
     def mkdir(self, url: str, message: str) -> bool:
         """
         创建目录
@@ -256,4 +779,69 @@ class SVNClient:
         """
         command = ['svn', 'copy', '-m', message, src, dst]
         success, _ = self._run_command(command)
-        return success 
\ No newline at end of file
+        return success 
+
+    def status_many(self, paths: Iterable[str], max_workers: int = 4,
+                    timeout: Optional[float] = None) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """
+        并发获取多个路径的状态
+        :param paths: 路径列表
+        :param max_workers: 最大并发数
+        :param timeout: 单个子进程的超时时间（秒）
+        :return: (路径, 状态列表, 错误信息) 迭代器，按完成顺序产出
+        """
+        def task(path: str) -> List[Dict[str, Any]]:
+            output = self._run_checked(['svn', 'status', '--xml', path], cwd=self._workdir(path), timeout=timeout)
+            return self._parse_status(output)
+        return self._run_many(task, paths, max_workers)
+
+    def info_many(self, paths: Iterable[str], max_workers: int = 4,
+                  timeout: Optional[float] = None) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """
+        并发获取多个路径的信息
+        :param paths: 路径列表
+        :param max_workers: 最大并发数
+        :param timeout: 单个子进程的超时时间（秒）
+        :return: (路径, 文件信息, 错误信息) 迭代器，按完成顺序产出
+        """
+        def task(path: str) -> Optional[Dict[str, Any]]:
+            output = self._run_checked(['svn', 'info', '--xml', path], cwd=self._workdir(path), timeout=timeout)
+            return self._parse_info(output)
+        return self._run_many(task, paths, max_workers)
+
+    def log_many(self, paths: Iterable[str], limit: int = 10, max_workers: int = 4,
+                 timeout: Optional[float] = None) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """
+        并发获取多个路径的提交日志
+        :param paths: 路径列表
+        :param limit: 日志数量限制
+        :param max_workers: 最大并发数
+        :param timeout: 单个子进程的超时时间（秒）
+        :return: (路径, 日志列表, 错误信息) 迭代器，按完成顺序产出
+        """
+        def task(path: str) -> List[Dict[str, Any]]:
+            command = ['svn', 'log', '--xml', '--limit', str(limit), path]
+            return self._parse_log(self._run_checked(command, cwd=self._workdir(path), timeout=timeout))
+        return self._run_many(task, paths, max_workers)
+
+    def update_many(self, paths: Iterable[str], revision: Optional[int] = None,
+                    max_workers: int = 4,
+                    timeout: Optional[float] = None) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """
+        并发更新多个工作副本
+        :param paths: 路径列表
+        :param revision: 版本号
+        :param max_workers: 最大并发数
+        :param timeout: 单个子进程的超时时间（秒）
+        :return: (路径, 是否成功, 错误信息) 迭代器，按完成顺序产出
+        """
+        def task(path: str) -> bool:
+            command = ['svn', 'update', path]
+            if revision:
+                command.extend(['-r', str(revision)])
+            try:
+                self._run_checked(command, cwd=path, timeout=timeout)
+            finally:
+                self.clear_cache()
+            return True
+        return self._run_many(task, paths, max_workers)
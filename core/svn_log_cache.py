@@ -0,0 +1,297 @@
+import sqlite3
+import threading
+import urllib.parse
+from typing import List, Optional, Dict, Any, Tuple
+
+from core.svn import SVNClient, get_client
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS repositories (
+    uuid TEXT PRIMARY KEY,
+    root_url TEXT NOT NULL,
+    last_revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS targets (
+    target TEXT PRIMARY KEY,
+    uuid TEXT NOT NULL,
+    rel_path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revisions (
+    uuid TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    author TEXT,
+    date TEXT,
+    message TEXT,
+    PRIMARY KEY (uuid, revision)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_revisions_author ON revisions (uuid, author, revision);
+CREATE INDEX IF NOT EXISTS idx_revisions_date ON revisions (uuid, date);
+CREATE TABLE IF NOT EXISTS changed_paths (
+    uuid TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    action TEXT,
+    kind TEXT,
+    copyfrom_path TEXT,
+    copyfrom_rev INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_changed_paths_path ON changed_paths (uuid, path, revision);
+'''
+
+# 每个修订中的路径唯一，重复写入同一修订范围（或并发刷新）时不会产生重复行；
+# 旧版本数据库先去重再建索引
+_UNIQUE_PATHS = '''
+DELETE FROM changed_paths WHERE rowid NOT IN
+    (SELECT MIN(rowid) FROM changed_paths GROUP BY uuid, revision, path);
+CREATE UNIQUE INDEX idx_changed_paths_unique ON changed_paths (uuid, revision, path);
+DROP INDEX IF EXISTS idx_changed_paths_revision;
+'''
+
+# 每批写入的修订数量，批次之间提交事务，中断后可以从已缓存的最大修订继续
+_BATCH_SIZE = 1000
+
+
+class SVNLogCache:
+    def __init__(self, db_path: str, client: Optional[SVNClient] = None):
+        """
+        初始化基于 SQLite 的 SVN 日志缓存
+        日志按仓库 UUID 和修订号存储，每次同步只拉取比已缓存最大修订更新的日志
+        :param db_path: SQLite 数据库文件路径
+        :param client: SVN 客户端，默认使用共享客户端
+        """
+        self.db_path = db_path
+        self.client = client or get_client()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' "
+                                 "AND name = 'idx_changed_paths_unique'").fetchone():
+            self.conn.executescript(_UNIQUE_PATHS)
+        self.fts = self._create_fts()
+
+    def _create_fts(self) -> bool:
+        """
+        创建提交信息的全文索引，SQLite 不支持 FTS5 时退回 LIKE 查询
+        """
+        try:
+            self.conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5('
+                              'message, uuid UNINDEXED, revision UNINDEXED)')
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
+
+    def _remote_info(self, target: str) -> Tuple[str, str, str, int]:
+        """
+        查询服务器上目标所在的仓库并登记到缓存
+        :param target: 工作副本路径或 URL
+        :return: (uuid, 仓库根 URL, 仓库内路径, 最新修订)
+        """
+        info = self.client.info(target, revision='HEAD')
+        if not info or not info.get('uuid'):
+            raise RuntimeError(f"Could not get repository info for {target}")
+        uuid, root = info['uuid'], info['repository_root']
+        rel_path = urllib.parse.unquote(info['url'][len(root):]) or '/'
+        with self.lock, self.conn:
+            self.conn.execute('INSERT INTO repositories (uuid, root_url) VALUES (?, ?) '
+                              'ON CONFLICT (uuid) DO UPDATE SET root_url = excluded.root_url',
+                              (uuid, root))
+            self.conn.execute('INSERT OR REPLACE INTO targets (target, uuid, rel_path) VALUES (?, ?, ?)',
+                              (target, uuid, rel_path))
+        return uuid, root, rel_path, int(info['revision'])
+
+    def _resolve(self, target: str, refresh: bool) -> Tuple[str, str]:
+        """
+        解析目标对应的仓库 UUID 和仓库内路径，需要时同步新修订
+        :param target: 工作副本路径或 URL
+        :param refresh: 是否访问服务器同步新修订
+        :return: (uuid, 仓库内路径)
+        """
+        if not refresh:
+            with self.lock:
+                row = self.conn.execute('SELECT uuid, rel_path FROM targets WHERE target = ?',
+                                        (target,)).fetchone()
+            if row:
+                return row[0], row[1]
+
+        uuid, root, rel_path, head = self._remote_info(target)
+        self._fetch(uuid, root, head)
+        return uuid, rel_path
+
+    def _fetch(self, uuid: str, root: str, head: int) -> int:
+        """
+        拉取仓库中比已缓存最大修订更新的日志（包含变更路径）
+        :param uuid: 仓库 UUID
+        :param root: 仓库根 URL
+        :param head: 服务器上的最新修订
+        :return: 新增的修订数量
+        """
+        with self.lock:
+            last = self.conn.execute('SELECT last_revision FROM repositories WHERE uuid = ?',
+                                     (uuid,)).fetchone()[0]
+        if head <= last:
+            return 0
+
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        for entry in self.client.iter_log(root, revision=f'{last + 1}:{head}', verbose=True):
+            batch.append(entry)
+            if len(batch) >= _BATCH_SIZE:
+                count += self._store(uuid, batch)
+                batch = []
+        count += self._store(uuid, batch)
+        return count
+
+    def _store(self, uuid: str, entries: List[Dict[str, Any]]) -> int:
+        """
+        在一个事务中写入一批日志并推进已缓存的最大修订
+        """
+        if not entries:
+            return 0
+        revisions = [(uuid, int(entry['revision']), entry['author'], entry['date'], entry['message'])
+                     for entry in entries]
+        paths = [(uuid, int(entry['revision']), item['path'], item['action'], item['kind'],
+                  item['copyfrom_path'],
+                  int(item['copyfrom_rev']) if item['copyfrom_rev'] else None)
+                 for entry in entries for item in entry.get('paths', ())]
+        with self.lock, self.conn:
+            # 立即获取写锁，避免并发刷新在检查已有修订和写入之间交错
+            self.conn.execute('BEGIN IMMEDIATE')
+            if self.fts:
+                # 重新写入已缓存的修订时先删除其全文索引记录
+                existing = self.conn.execute(
+                    'SELECT revision FROM revisions WHERE uuid = ? AND revision BETWEEN ? AND ?',
+                    (uuid, min(row[1] for row in revisions), max(row[1] for row in revisions))
+                ).fetchall()
+                stored = {row[1] for row in revisions}
+                self.conn.executemany('DELETE FROM messages_fts WHERE uuid = ? AND revision = ?',
+                                      [(uuid, revision) for revision, in existing if revision in stored])
+            self.conn.executemany('INSERT OR REPLACE INTO revisions VALUES (?, ?, ?, ?, ?)', revisions)
+            self.conn.executemany('INSERT OR IGNORE INTO changed_paths VALUES (?, ?, ?, ?, ?, ?, ?)', paths)
+            if self.fts:
+                self.conn.executemany('INSERT INTO messages_fts (message, uuid, revision) VALUES (?, ?, ?)',
+                                      [(message or '', uuid, revision)
+                                       for uuid, revision, _, _, message in revisions])
+            self.conn.execute('UPDATE repositories SET last_revision = MAX(last_revision, ?) WHERE uuid = ?',
+                              (max(row[1] for row in revisions), uuid))
+        return len(revisions)
+
+    def sync(self, target: str) -> int:
+        """
+        同步目标所在仓库的新修订
+        :param target: 工作副本路径或 URL
+        :return: 新增的修订数量
+        """
+        uuid, root, _, head = self._remote_info(target)
+        return self._fetch(uuid, root, head)
+
+    def _query(self, target: str, conditions: List[str], params: List[Any],
+               limit: Optional[int], verbose: bool, refresh: bool) -> List[Dict[str, Any]]:
+        """
+        查询目标路径下的日志，按修订号倒序返回
+        """
+        uuid, rel_path = self._resolve(target, refresh)
+        sql = 'SELECT revision, author, date, message FROM revisions r WHERE r.uuid = ?'
+        args: List[Any] = [uuid]
+        if rel_path != '/':
+            # '/' 之后的下一个字符是 '0'，用范围查询匹配目录下的所有路径，可以使用索引
+            sql += (' AND EXISTS (SELECT 1 FROM changed_paths c WHERE c.uuid = r.uuid'
+                    ' AND c.revision = r.revision'
+                    ' AND (c.path = ? OR (c.path >= ? AND c.path < ?)))')
+            args.extend([rel_path, rel_path + '/', rel_path + '0'])
+        for condition in conditions:
+            sql += ' AND ' + condition
+        args.extend(params)
+        sql += ' ORDER BY revision DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            args.append(int(limit))
+
+        with self.lock:
+            rows = self.conn.execute(sql, args).fetchall()
+            entries = [{'revision': str(revision), 'author': author, 'date': date, 'message': message}
+                       for revision, author, date, message in rows]
+            if verbose:
+                for entry in entries:
+                    entry['paths'] = [{
+                        'path': path,
+                        'action': action,
+                        'kind': kind,
+                        'copyfrom_path': copyfrom_path,
+                        'copyfrom_rev': str(copyfrom_rev) if copyfrom_rev is not None else None
+                    } for path, action, kind, copyfrom_path, copyfrom_rev in self.conn.execute(
+                        'SELECT path, action, kind, copyfrom_path, copyfrom_rev FROM changed_paths '
+                        'WHERE uuid = ? AND revision = ?', (uuid, int(entry['revision'])))]
+        return entries
+
+    def log(self, target: str, limit: int = 10, verbose: bool = False,
+            refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        获取提交日志，结果与 SVNClient.log 的格式一致
+        :param target: 工作副本路径或 URL
+        :param limit: 日志数量限制
+        :param verbose: 是否包含变更路径
+        :param refresh: 是否先从服务器同步新修订，False 时只查询本地缓存
+        :return: 日志列表
+        """
+        return self._query(target, [], [], limit, verbose, refresh)
+
+    def by_author(self, target: str, author: str, limit: Optional[int] = None,
+                  verbose: bool = False, refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        按作者查询提交日志
+        :param target: 工作副本路径或 URL
+        :param author: 作者
+        :param limit: 日志数量限制
+        :param verbose: 是否包含变更路径
+        :param refresh: 是否先从服务器同步新修订
+        :return: 日志列表
+        """
+        return self._query(target, ['author = ?'], [author], limit, verbose, refresh)
+
+    def by_date(self, target: str, start: Optional[str] = None, end: Optional[str] = None,
+                limit: Optional[int] = None, verbose: bool = False,
+                refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        按日期范围查询提交日志
+        :param target: 工作副本路径或 URL
+        :param start: 起始日期（例如 '2024-03-01'，包含）
+        :param end: 结束日期（例如 '2024-03-31'，包含）
+        :param limit: 日志数量限制
+        :param verbose: 是否包含变更路径
+        :param refresh: 是否先从服务器同步新修订
+        :return: 日志列表
+        """
+        conditions, params = [], []
+        if start:
+            conditions.append('date >= ?')
+            params.append(start)
+        if end:
+            conditions.append('date <= ?')
+            # svn 日期格式为 2024-03-31T12:00:00.000000Z，只给出日期时包含当天全部时间
+            params.append(end + 'T99' if len(end) == 10 else end)
+        return self._query(target, conditions, params, limit, verbose, refresh)
+
+    def search(self, target: str, text: str, limit: Optional[int] = None,
+               verbose: bool = False, refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        按提交信息搜索日志，支持 FTS5 时使用全文索引
+        :param target: 工作副本路径或 URL
+        :param text: 搜索内容
+        :param limit: 日志数量限制
+        :param verbose: 是否包含变更路径
+        :param refresh: 是否先从服务器同步新修订
+        :return: 日志列表
+        """
+        if self.fts:
+            phrase = '"' + text.replace('"', '""') + '"'
+            condition = ('revision IN (SELECT revision FROM messages_fts '
+                         'WHERE messages_fts MATCH ? AND uuid = r.uuid)')
+            return self._query(target, [condition], [phrase], limit, verbose, refresh)
+        return self._query(target, ["message LIKE ? ESCAPE '\\'"],
+                           ['%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'],
+                           limit, verbose, refresh)
@@ -4,11 +4,14 @@ import json
 import urllib.parse
 from socketserver import ThreadingMixIn
 import signal
+from utils.tracing import span
+from utils.profiling import install_signal_toggle
 
 class Request:
     def __init__(self, handler: BaseHTTPRequestHandler):
         self.method = handler.command
         self.path = handler.path
+        self.client_address = handler.client_address[0]
         self.headers = dict(handler.headers)
         self.body = {}
         
@@ -102,25 +105,29 @@ class RequestHandler(BaseHTTPRequestHandler):
         self.handle_request('DELETE')
 
     def handle_request(self, method: str):
-        """处理请求"""
-        # 创建请求对象
-        request = Request(self)
-
-        # 执行中间件
-        for middleware in self.app.middlewares:
-            response = middleware(request)
-            if response is not None:
-                response.send(self)
-                return
-
-        # 查找路由处理函数
+        """处理请求（整个处理过程记录为一个追踪 span）"""
         path = self.path.split('?')[0]  # 移除查询参数
-        if path in self.app.routes and method in self.app.routes[path]:
-            handler = self.app.routes[path][method]
-            response = handler(request)
-            response.send(self)
-        else:
-            Response('Not Found', 404).send(self)
+        with span(f"{method} {path}", method=method, path=path) as request_span:
+            # 创建请求对象
+            request = Request(self)
+
+            # 执行中间件
+            for middleware in self.app.middlewares:
+                response = middleware(request)
+                if response is not None:
+                    request_span.set(status=response.status_code)
+                    response.send(self)
+                    return
+
+            # 查找路由处理函数
+            if path in self.app.routes and method in self.app.routes[path]:
+                handler = self.app.routes[path][method]
+                response = handler(request)
+                request_span.set(status=response.status_code)
+                response.send(self)
+            else:
+                request_span.set(status=404)
+                Response('Not Found', 404).send(self)
 
 class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
     """支持多线程的 HTTP 服务器"""
@@ -139,6 +146,8 @@ def run_server(app: WebApp, host: str = 'localhost', port: int = 8089):
     # 注册信号处理器
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    # SIGUSR1 开启/停止运行时性能分析（也可用 POST /admin/profile）
+    install_signal_toggle("web")
     
     print(f"服务器运行在 http://{host}:{port}")
     print("按 Ctrl+C 可以优雅地关闭服务器")
@@ -0,0 +1,23 @@
+from core.web import get, post, Request, Response
+from utils.profiling import PROFILE_MODES, toggle, active_mode
+from config.main import PROFILE_SIGNAL_MODE
+
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+@get('/admin/profile')
+def get_profile(request: Request) -> Response:
+    """查询运行时性能分析状态"""
+    if request.client_address not in LOCAL_ADDRESSES:
+        return Response('Forbidden', 403)
+    mode = active_mode()
+    return Response({'running': mode is not None, 'mode': mode})
+
+@post('/admin/profile')
+def toggle_profile(request: Request) -> Response:
+    """开启或停止运行时性能分析，停止时写入报告并返回摘要"""
+    if request.client_address not in LOCAL_ADDRESSES:
+        return Response('Forbidden', 403)
+    mode = request.body.get('mode') or PROFILE_SIGNAL_MODE
+    if mode not in PROFILE_MODES:
+        return Response(f"Unknown profile mode: {mode}", 400)
+    return Response(toggle(mode, 'web'))
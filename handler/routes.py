@@ -1 +1,3 @@
-from . import user
\ No newline at end of file
+from . import user
+from . import admin
+from . import svn_sync
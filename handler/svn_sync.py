@@ -1,22 +1,42 @@
 from core.web import post, Response
+from service.scheduler import load_pairs, select_pairs, run_pairs, repo_locks
 from service.svn_sync import sync_paths
 from utils.logger import SyncLogger
-from config.svn import LOG_FILE
+from config.svn import A_REPO_PATH, B_REPO_PATH, LOG_FILE
+
+def _split(value):
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
 
 @post('/sync')
 def handle_sync(request):
-    paths = request.body.get("paths", "")
-    paths = [p.strip() for p in paths.split(",") if p.strip()]
-    
-    if not paths:
-        return Response("Error: No valid paths provided", status_code=400)
-    
-    logger = SyncLogger(LOG_FILE, to_stdout=False)
+    paths = _split(request.body.get("paths", ""))
+    names = _split(request.body.get("pairs") or request.body.get("pair"))
+
+    if not names:
+        # Single-pair request: sync A -> B and answer with the plain logs
+        if not paths:
+            return Response("Error: No valid paths provided", status_code=400)
+
+        logger = SyncLogger(LOG_FILE, to_stdout=False)
+        try:
+            with repo_locks([A_REPO_PATH, B_REPO_PATH], logger):
+                sync_paths(paths, logger)
+            return Response(logger.get_logs())
+        except Exception as e:
+            return Response(
+                f"Error: {str(e)}\n\nLogs:\n{logger.get_logs()}",
+                status_code=500
+            )
+
     try:
-        sync_paths(paths, logger)
-        return Response(logger.get_logs())
-    except Exception as e:
-        return Response(
-            f"Error: {str(e)}\n\nLogs:\n{logger.get_logs()}",
-            status_code=500
-        ) 
\ No newline at end of file
+        pairs = select_pairs(load_pairs(), None if names == ["*"] else names)
+    except (OSError, ValueError) as e:
+        return Response({"error": str(e)}, status_code=400)
+    if not paths and not all(pair.paths for pair in pairs):
+        return Response({"error": "No valid paths provided"}, status_code=400)
+
+    results = run_pairs(pairs, paths)
+    ok = all(result["ok"] for result in results)
+    return Response({"ok": ok, "pairs": results}, status_code=200 if ok else 500)
@@ -32,28 +32,123 @@ def execute_action(action_path: str, func_name: str, args: List[str]) -> Any:
         print(f"Error executing function: {str(e)}")
         sys.exit(1)
 
-def main():
-    # 检查参数数量
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <action.function> [args...]")
-        print("Example: python main.py say.hello andy")
-        print("Example: python main.py web.run_server localhost 8000")
-        sys.exit(1)
-
+def run_action(argv: List[str]) -> Any:
+    """
+    解析并执行命令行形式的动作
+    :param argv: 参数列表（例如：['say.hello', 'andy']）
+    :return: 函数执行结果
+    """
     # 解析动作路径
-    action_parts = sys.argv[1].split('.')
+    action_parts = argv[0].split('.')
     if len(action_parts) != 2:
         print("Error: Action should be in format 'module.function'")
         sys.exit(1)
 
     action_path, func_name = action_parts[0], action_parts[1]
-    args = sys.argv[2:]  # 获取其余参数
+    args = argv[1:]  # 获取其余参数
 
     # 执行动作
-    result = execute_action(action_path, func_name, args)
+    return execute_action(action_path, func_name, args)
+
+def preload_actions() -> None:
+    """
+    预先导入所有动作模块，使守护进程处理首个请求时无需再导入
+    """
+    import pkgutil
+    import action
+
+    for module in pkgutil.iter_modules(action.__path__):
+        if module.name.startswith('test_'):
+            continue
+        try:
+            importlib.import_module(f"action.{module.name}")
+        except Exception as e:
+            print(f"Warning: Could not preload action.{module.name}: {str(e)}")
+
+def run_batch_file(argv: List[str]) -> None:
+    """
+    批量执行任务文件中的动作，每个任务输出一行 JSON 结果
+    :param argv: --batch 之后的参数（任务文件或 -，以及 --pool、--workers）
+    """
+    import argparse
+    from config.main import BATCH_POOL, BATCH_WORKERS
+    from utils.batch import BATCH_POOLS, read_jobs, run_batch
+
+    parser = argparse.ArgumentParser(prog="main.py --batch", description="Run many actions in one process")
+    parser.add_argument("jobs", help="file with one 'module.function args...' per line, '-' for stdin")
+    parser.add_argument("--pool", choices=BATCH_POOLS, default=BATCH_POOL,
+                        help="thread pool for I/O-bound actions, process pool for CPU-bound ones")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="number of jobs run at once")
+    options = parser.parse_args(argv)
+
+    failed = run_batch(run_action, read_jobs(options.jobs), options.pool, options.workers)
+    sys.exit(1 if failed else 0)
+
+def dispatch(argv: List[str]) -> None:
+    """
+    按模式执行命令行参数（批量、守护进程、转发或单个动作）
+    :param argv: 去掉 --profile 之后的参数列表
+    """
+    # 批量模式：一个进程内并发执行多个动作
+    if argv[0] == '--batch':
+        run_batch_file(argv[1:])
+        return
+
+    # 常驻守护进程：在 Unix socket 上接收 --remote 转发的动作
+    if argv[0] == '--daemon':
+        from utils.daemon import serve
+        preload_actions()
+        serve(run_action)
+        return
+
+    # 转发给守护进程执行，没有守护进程时在本进程执行
+    if argv[0] == '--remote':
+        from utils.daemon import forward
+        if len(argv) < 2:
+            print("Usage: python main.py --remote <action.function> [args...]")
+            sys.exit(1)
+        reply = forward(argv[1:])
+        if reply is not None:
+            status, output = reply
+            sys.stdout.write(output)
+            sys.exit(status)
+        run_action(argv[1:])
+        return
+
+    result = run_action(argv)
     if result is not None:
         pass
         # print(result)
 
+def main():
+    argv = sys.argv[1:]
+
+    # --profile=cpu|mem|wall：在性能分析下执行，结束时写入报告
+    profile_mode = None
+    if argv and argv[0].startswith('--profile='):
+        profile_mode = argv.pop(0).split('=', 1)[1]
+
+    # 检查参数数量
+    if not argv:
+        print("Usage: python main.py [--profile=cpu|mem|wall] <action.function> [args...]")
+        print("       python main.py --batch <jobs file|-> [--pool thread|process] [--workers N]")
+        print("       python main.py --daemon")
+        print("       python main.py --remote <action.function> [args...]")
+        print("Example: python main.py say.hello andy")
+        print("Example: python main.py web.run_server localhost 8000")
+        print("Example: python main.py --profile=cpu svn_sync.main --paths trunk")
+        sys.exit(1)
+
+    if profile_mode is None:
+        dispatch(argv)
+        return
+
+    from utils.profiling import PROFILE_MODES, profiled
+    if profile_mode not in PROFILE_MODES:
+        print(f"Error: Profile mode should be one of {', '.join(PROFILE_MODES)}")
+        sys.exit(1)
+    with profiled(profile_mode, argv[0].lstrip('-')):
+        dispatch(argv)
+
 if __name__ == "__main__":
     main()
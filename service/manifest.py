@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest (
+    pair TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest BLOB,
+    PRIMARY KEY (pair, path)
+) WITHOUT ROWID;
+"""
+
+# Seconds a connection waits for another sync (e.g. a parallel pair) to finish writing
+BUSY_TIMEOUT = 30
+
+def _connect(db_path):
+    return closing(sqlite3.connect(db_path, timeout=BUSY_TIMEOUT))
+
+class Manifest:
+    """On-disk index of file size, mtime, inode and content hash for one repo pair.
+
+    Hashes are reused as long as a file's stat signature is unchanged, so a
+    sync only hashes files that may have changed since the previous run.
+    Changes are kept in memory and written back incrementally by save().
+    Pairs syncing in parallel share the database file, in WAL mode.
+    """
+
+    def __init__(self, db_path, pair):
+        self.db_path = db_path
+        self.pair = pair
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.dirty = set()
+        self.removed = set()
+        self.hash_hits = 0
+        self.hash_misses = 0
+        with _connect(db_path) as conn:
+            # WAL lets pairs read while another pair saves
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            for path, size, mtime_ns, inode, digest in conn.execute(
+                "SELECT path, size, mtime_ns, inode, digest FROM manifest WHERE pair = ?",
+                (pair,)
+            ):
+                self.entries[path] = (size, mtime_ns, inode, digest)
+
+    def digest(self, path, st, compute):
+        """Return the content hash of path, reusing the stored one if its stat is unchanged."""
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry is not None and entry[3] is not None and entry[:3] == (st.st_size, st.st_mtime_ns, st.st_ino):
+            self.hash_hits += 1
+            return entry[3]
+        self.hash_misses += 1
+        value = compute(path)
+        self.record(path, st, value)
+        return value
+
+    def known_digest(self, path, st):
+        """Return the stored hash of path if its stat is unchanged, without hashing."""
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry is not None and entry[:3] == (st.st_size, st.st_mtime_ns, st.st_ino):
+            return entry[3]
+        return None
+
+    def record(self, path, st, digest=None):
+        """Store the stat signature (and hash, if known) of path."""
+        entry = (st.st_size, st.st_mtime_ns, st.st_ino, digest)
+        with self.lock:
+            if self.entries.get(path) != entry:
+                self.entries[path] = entry
+                self.dirty.add(path)
+                self.removed.discard(path)
+
+    def forget(self, path):
+        """Drop path and everything below it from the index."""
+        prefix = path.rstrip(os.sep) + os.sep
+        with self.lock:
+            for key in [k for k in self.entries if k == path or k.startswith(prefix)]:
+                del self.entries[key]
+                self.dirty.discard(key)
+                self.removed.add(key)
+
+    def save(self):
+        """Write changed and removed entries back in one transaction."""
+        with self.lock:
+            rows = [(self.pair, path) + self.entries[path] for path in self.dirty]
+            removed = [(self.pair, path) for path in self.removed]
+            self.dirty.clear()
+            self.removed.clear()
+        if not rows and not removed:
+            return
+        with _connect(self.db_path) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("DELETE FROM manifest WHERE pair = ? AND path = ?", removed)
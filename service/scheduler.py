@@ -0,0 +1,247 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from config.svn import (
+    A_REPO_PATH, B_REPO_PATH, SYNC_PAIRS, SYNC_PAIRS_FILE, SYNC_MAX_PARALLEL_PAIRS,
+    SYNC_LOCK_DIR, SYNC_WATCH_DEBOUNCE, SYNC_WATCH_MAX_DELAY, SYNC_WATCH_POLL_INTERVAL,
+    SYNC_REVISION_POLL_INTERVAL, LOG_FILE
+)
+from service.svn_sync import sync_paths
+from service.url_sync import url_sync
+from service.watcher import SyncWatcher
+from utils.logger import SyncLogger
+
+DEFAULT_PAIR = "default"
+SUMMARY_KEYS = ("added", "updated", "removed", "unchanged", "bytes_copied")
+
+SYNC_MODES = ("wc", "url")
+
+class SyncPair:
+    """One mirror pair: paths of the source are synced into the target and committed.
+
+    In "wc" mode source and target are working copies; in "url" mode they
+    are repository URLs mirrored with svnmucc, without working copies.
+    """
+
+    def __init__(self, name, source, target, paths=(), interval=None, mode="wc"):
+        if mode not in SYNC_MODES:
+            raise ValueError(f"Unknown sync mode for {name}: {mode}")
+        self.name = name
+        self.source = source
+        self.target = target
+        self.paths = list(paths)
+        self.interval = interval
+        self.mode = mode
+
+    @classmethod
+    def from_dict(cls, data):
+        missing = [key for key in ("name", "source", "target") if not data.get(key)]
+        if missing:
+            raise ValueError(f"Sync pair is missing {', '.join(missing)}: {data}")
+        paths = data.get("paths", [])
+        if isinstance(paths, str):
+            paths = [p.strip() for p in paths.split(",") if p.strip()]
+        interval = data.get("interval")
+        return cls(
+            data["name"], data["source"], data["target"], paths,
+            float(interval) if interval else None,
+            data.get("mode", "wc")
+        )
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "source": self.source,
+            "target": self.target,
+            "paths": self.paths,
+            "interval": self.interval,
+            "mode": self.mode,
+        }
+
+def load_pairs(path=SYNC_PAIRS_FILE):
+    """Load sync pairs from the JSON file, else SYNC_PAIRS, else the single A -> B pair."""
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        entries = data.get("pairs", []) if isinstance(data, dict) else data
+    else:
+        entries = SYNC_PAIRS
+
+    pairs = [SyncPair.from_dict(entry) for entry in entries]
+    if not pairs:
+        return [SyncPair(DEFAULT_PAIR, A_REPO_PATH, B_REPO_PATH)]
+    names = [pair.name for pair in pairs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate sync pair name(s): {', '.join(duplicates)}")
+    return pairs
+
+def select_pairs(pairs, names=None):
+    """Return the pairs called names, in that order, or all pairs when names is empty."""
+    if not names:
+        return list(pairs)
+    by_name = {pair.name: pair for pair in pairs}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown sync pair(s): {', '.join(unknown)}")
+    return [by_name[name] for name in names]
+
+def lock_path(repo_path):
+    """Lock file guarding one working copy or repository URL."""
+    if "://" not in repo_path:
+        repo_path = os.path.realpath(repo_path)
+    key = hashlib.sha1(repo_path.encode("utf-8")).hexdigest()
+    return os.path.join(SYNC_LOCK_DIR, f"{key}.lock")
+
+@contextmanager
+def repo_locks(repo_paths, logger=None):
+    """Hold an exclusive flock on every working copy in repo_paths.
+
+    Locks are always taken in the same (sorted) order, so pairs sharing
+    working copies wait for each other instead of deadlocking. flock locks
+    belong to the open file, so they also exclude other threads and
+    processes.
+    """
+    os.makedirs(SYNC_LOCK_DIR, exist_ok=True)
+    locks = {lock_path(repo): repo for repo in repo_paths}
+    with ExitStack() as stack:
+        for path in sorted(locks):
+            f = stack.enter_context(open(path, "a"))
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                if logger:
+                    logger.log(f"Waiting for lock on {locks[path]}")
+                fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+def run_pair(pair, paths=None, to_stdout=False, update_source=True):
+    """Sync one pair under its working copy locks and return its result dict."""
+    paths = list(paths or pair.paths)
+    logger = SyncLogger(LOG_FILE, to_stdout, prefix=f"[{pair.name}] ")
+    result = {"pair": pair.name, "run": logger.run_id, "ok": False, "paths": paths, "error": None}
+    result.update(dict.fromkeys(SUMMARY_KEYS, 0))
+    started = time.monotonic()
+    try:
+        if not paths:
+            raise ValueError("No valid paths provided")
+        with repo_locks([pair.source, pair.target], logger):
+            if pair.mode == "url":
+                summaries = url_sync(pair.source, pair.target, paths, logger)
+            else:
+                summaries = sync_paths(paths, logger, pair.source, pair.target, update_source)
+        for summary in summaries.values():
+            if summary is not None:
+                for key in SUMMARY_KEYS:
+                    result[key] += summary[key]
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    result["duration"] = round(time.monotonic() - started, 3)
+    result["logs"] = logger.get_logs()
+    return result
+
+def run_pairs(pairs, paths=None, max_parallel=SYNC_MAX_PARALLEL_PAIRS, to_stdout=False):
+    """Sync pairs concurrently, at most max_parallel at a time.
+
+    A failing pair does not stop the others. Returns one result dict per
+    pair, in the order given.
+    """
+    if len(pairs) == 1:
+        return [run_pair(pairs[0], paths, to_stdout)]
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+        return list(executor.map(lambda pair: run_pair(pair, paths, to_stdout), pairs))
+
+def format_result(result):
+    """Format one pair result for logging."""
+    if not result["ok"]:
+        return f"{result['pair']}: failed after {result['duration']:.2f}s: {result['error']}"
+    return (
+        f"{result['pair']}: ok in {result['duration']:.2f}s "
+        f"({result['added']} added, {result['updated']} updated, "
+        f"{result['removed']} removed, {result['unchanged']} unchanged)"
+    )
+
+def run_schedule(pairs, max_parallel=SYNC_MAX_PARALLEL_PAIRS, to_stdout=False,
+                 stop_event=None, on_result=None):
+    """Run each pair with an interval again and again until stop_event is set.
+
+    A pair is next due `interval` seconds after its previous run finished,
+    and never runs twice at once. Pairs without an interval are ignored.
+    """
+    scheduled = [pair for pair in pairs if pair.interval]
+    if not scheduled:
+        raise ValueError("No sync pair has a schedule interval")
+    stop_event = stop_event or threading.Event()
+    next_due = {pair.name: 0.0 for pair in scheduled}
+    running = set()
+    lock = threading.Lock()
+
+    def finished(pair, future):
+        with lock:
+            running.discard(pair.name)
+            next_due[pair.name] = time.monotonic() + pair.interval
+        if on_result and future.exception() is None:
+            on_result(future.result())
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+        while not stop_event.is_set():
+            now = time.monotonic()
+            with lock:
+                due = [p for p in scheduled if p.name not in running and next_due[p.name] <= now]
+                running.update(pair.name for pair in due)
+                wake = min(
+                    (next_due[p.name] for p in scheduled if p.name not in running),
+                    default=now + 1.0
+                )
+            for pair in due:
+                future = executor.submit(run_pair, pair, None, to_stdout)
+                future.add_done_callback(lambda f, pair=pair: finished(pair, f))
+            stop_event.wait(min(max(wake - now, 0.1), 1.0))
+
+def watch_pairs(pairs, to_stdout=False, stop_event=None, on_result=None,
+                debounce=SYNC_WATCH_DEBOUNCE, max_delay=SYNC_WATCH_MAX_DELAY,
+                revision_interval=SYNC_REVISION_POLL_INTERVAL,
+                poll_interval=SYNC_WATCH_POLL_INTERVAL):
+    """Watch every pair's source paths and sync changes as they happen, until stop_event is set."""
+    url_pairs = [pair.name for pair in pairs if pair.mode == "url"]
+    if url_pairs:
+        raise ValueError(f"Watch mode needs working copies, not URLs: {', '.join(url_pairs)}")
+    missing = [pair.name for pair in pairs if not pair.paths]
+    if missing:
+        raise ValueError(f"No paths configured to watch for: {', '.join(missing)}")
+    stop_event = stop_event or threading.Event()
+    client = None
+    if revision_interval:
+        from core.svn import get_client
+        client = get_client()
+
+    def sync(pair, paths, update_source):
+        result = run_pair(pair, paths, to_stdout, update_source)
+        if on_result:
+            on_result(result)
+        return result
+
+    watchers = [
+        SyncWatcher(
+            pair, sync, SyncLogger(LOG_FILE, to_stdout, prefix=f"[{pair.name}] "),
+            debounce, max_delay, revision_interval or None, poll_interval, client
+        )
+        for pair in pairs
+    ]
+    threads = [threading.Thread(target=w.run, name=f"watch:{w.pair.name}", daemon=True) for w in watchers]
+    for thread in threads:
+        thread.start()
+    try:
+        while not stop_event.wait(1.0) and any(t.is_alive() for t in threads):
+            pass
+    finally:
+        for watcher in watchers:
+            watcher.stop()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.tracing import span, current_span
+
+class StageGraph:
+    """A small DAG of named stages run concurrently on a bounded executor.
+
+    A stage starts once all of its dependencies have finished. If a stage
+    fails, no new stages are started, the running ones are allowed to
+    finish and the first error is re-raised. Start and end times of every
+    stage are recorded relative to the start of the run. With a logger,
+    messages logged while a stage runs are tagged with its name and each
+    stage's duration is logged when it ends.
+    """
+
+    def __init__(self, max_workers=4, logger=None):
+        self.max_workers = max_workers
+        self.logger = logger
+        self.stages = {}
+        self.timings = {}
+
+    def add(self, name, func, deps=()):
+        """Add a stage; deps must name stages that were already added."""
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dep}")
+        self.stages[name] = (func, tuple(deps))
+        return name
+
+    def _timed(self, name, func, origin, parent):
+        start = time.monotonic() - origin
+        try:
+            with span(f"stage:{name}", parent=parent):
+                if self.logger is None:
+                    return func()
+                with self.logger.stage(name):
+                    return func()
+        finally:
+            end = time.monotonic() - origin
+            self.timings[name] = (start, end)
+            if self.logger is not None:
+                self.logger.log(f"Stage {name} finished in {end - start:.2f}s", stage=name, duration=end - start)
+
+    def run(self):
+        """Run all stages, returning a dict of stage name -> result."""
+        origin = time.monotonic()
+        # Stages run on pool threads; nest their spans under the caller's
+        parent = current_span()
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for name, (func, deps) in list(pending.items()):
+                        if all(dep in results for dep in deps):
+                            del pending[name]
+                            running[executor.submit(self._timed, name, func, origin, parent)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        return results
+
+    def critical_path(self):
+        """Return the chain of stages that ended last, following the latest-finishing dependency."""
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [name]
+        while True:
+            deps = [dep for dep in self.stages[name][1] if dep in self.timings]
+            if not deps:
+                break
+            name = max(deps, key=lambda n: self.timings[n][1])
+            path.append(name)
+        return list(reversed(path))
+
+    def format_timings(self):
+        """Format per-stage durations and the critical path for logging."""
+        lines = [
+            f"  {name}: {end - start:.2f}s (start +{start:.2f}s)"
+            for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0])
+        ]
+        path = self.critical_path()
+        if path:
+            total = self.timings[path[-1]][1]
+            lines.append(f"  critical path ({total:.2f}s): {' -> '.join(path)}")
+        return "\n".join(lines)
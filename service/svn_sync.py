@@ -1,96 +1,201 @@
 import os
-import subprocess
-import shutil
-from config.svn import A_REPO_PATH, B_REPO_PATH
+import tempfile
+import xml.etree.ElementTree as ET
+from config.svn import (
+    A_REPO_PATH, B_REPO_PATH, SVN_TARGETS_CHUNK, SYNC_MANIFEST_DB, SYNC_STAGE_WORKERS,
+    SYNC_COMMAND_TIMEOUT, SYNC_TRACE_DIR
+)
+from service.manifest import Manifest
+from service.stages import StageGraph
+from service.tree_sync import sync_tree, format_summary
 from utils.logger import SyncLogger
+from utils.process import run_command
+from utils.tracing import span, format_breakdown, export_chrome_trace
 
-def run_cmd(cmd, cwd, logger):
-    """Execute a command and log its output."""
-    logger.log(f"Executing command: {cmd} (in {cwd})")
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            shell=True,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        if result.stdout:
-            logger.log(result.stdout.strip())
-        if result.stderr:
-            logger.log(result.stderr.strip())
-        return result.returncode
-    except subprocess.CalledProcessError as e:
-        logger.log(f"Command failed: {e}")
-        logger.log(f"Error output: {e.stderr}")
-        raise
+def run_cmd(argv, cwd, logger, timeout=SYNC_COMMAND_TIMEOUT, **kwargs):
+    """Execute an argv command, streaming its output to the log as it runs."""
+    return run_command(argv, cwd=cwd, logger=logger, timeout=timeout, **kwargs)
 
 def svn_revert_and_update(repo_path, logger):
     """Revert and update SVN repository."""
     logger.log(f"Processing repository: {repo_path}")
-    run_cmd("svn revert -R .", repo_path, logger)
-    run_cmd("svn update", repo_path, logger)
+    run_cmd(["svn", "revert", "-R", "."], repo_path, logger)
+    run_cmd(["svn", "update"], repo_path, logger)
 
-def sync_paths(paths, logger):
-    """Main synchronization function."""
-    try:
-        # 1. SVN revert & update
-        logger.log("Starting synchronization process")
-        svn_revert_and_update(A_REPO_PATH, logger)
-        svn_revert_and_update(B_REPO_PATH, logger)
-
-        # 2. Sync each path
-        for rel_path in paths:
-            src = os.path.join(A_REPO_PATH, rel_path)
-            dst = os.path.join(B_REPO_PATH, rel_path)
-            
-            if not os.path.exists(src):
-                logger.log(f"Warning: Source path does not exist: {src}")
+class StatusParser:
+    """Incrementally parse `svn status --xml` output fed line by line.
+
+    Each entry is logged in the short `svn status` form as soon as it is
+    parsed, so one invocation serves both the log and the add/delete lists.
+    """
+
+    SHORT_CODES = {
+        "added": "A", "deleted": "D", "modified": "M", "replaced": "R",
+        "conflicted": "C", "unversioned": "?", "missing": "!",
+        "obstructed": "~", "ignored": "I", "external": "X", "incomplete": "!",
+    }
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.parser = ET.XMLPullParser(events=("end",))
+        self.unversioned = []
+        self.missing = []
+
+    def feed(self, line):
+        self.parser.feed(line)
+        for _, elem in self.parser.read_events():
+            if elem.tag != "entry":
                 continue
-                
-            logger.log(f"Syncing {src} -> {dst}")
-
-            # Remove existing destination if it exists
-            if os.path.exists(dst):
-                if os.path.isdir(dst):
-                    shutil.rmtree(dst)
-                else:
-                    os.remove(dst)
-
-            # Copy from source to destination
-            if os.path.isdir(src):
-                shutil.copytree(src, dst)
-            else:
-                os.makedirs(os.path.dirname(dst), exist_ok=True)
-                shutil.copy2(src, dst)
-
-        # 3. Process SVN changes
-        logger.log("Processing SVN changes")
-        run_cmd("svn status", B_REPO_PATH, logger)
-        
-        # Get SVN status and process changes
-        result = subprocess.run(
-            "svn status",
-            cwd=B_REPO_PATH,
-            shell=True,
-            capture_output=True,
-            text=True
+            item = elem.find("wc-status").get("item")
+            path = elem.get("path")
+            if self.logger:
+                self.logger.log(f"{self.SHORT_CODES.get(item, ' ')}       {path}")
+            if item == "unversioned":
+                self.unversioned.append(path)
+            elif item == "missing":
+                self.missing.append(path)
+            elem.clear()
+
+def svn_status_changes(repo_path, logger=None):
+    """Return (unversioned, missing) paths reported by `svn status --xml`.
+
+    With a logger, the status is also logged as it streams in.
+    """
+    parser = StatusParser(logger)
+    run_cmd(
+        ["svn", "status", "--xml"], repo_path, logger,
+        on_stdout=parser.feed, capture=False, log_stdout=False
+    )
+    return parser.unversioned, parser.missing
+
+def svn_batch(action, file_paths, repo_path, logger, chunk_size=SVN_TARGETS_CHUNK):
+    """Run `svn <action> --targets` over file_paths in chunks of chunk_size."""
+    for start in range(0, len(file_paths), chunk_size):
+        chunk = file_paths[start:start + chunk_size]
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", suffix=".targets", delete=False
+        ) as targets:
+            # A trailing "@" stops svn from reading "@" in file names as a peg revision
+            targets.write("".join(p + "@\n" if "@" in p else p + "\n" for p in chunk))
+        try:
+            logger.log(f"svn {action}: {len(chunk)} path(s)")
+            run_cmd(["svn", action, "--targets", targets.name], repo_path, logger)
+        finally:
+            os.remove(targets.name)
+
+def sync_path(rel_path, manifest, logger, src_repo=A_REPO_PATH, dst_repo=B_REPO_PATH):
+    """Mirror one path from the source working copy to the target."""
+    src = os.path.join(src_repo, rel_path)
+    dst = os.path.join(dst_repo, rel_path)
+
+    if not os.path.exists(src):
+        logger.log(f"Warning: Source path does not exist: {src}")
+        return None
+
+    logger.log(f"Syncing {src} -> {dst}")
+
+    # Copy only new or changed files and remove vanished ones
+    try:
+        summary = sync_tree(src, dst, manifest=manifest)
+    finally:
+        manifest.save()
+    logger.log(f"Synced {rel_path}: {format_summary(summary)}")
+    return summary
+
+def process_svn_changes(logger, repo_path=B_REPO_PATH):
+    """Schedule unversioned and missing files in the target for add/delete."""
+    logger.log("Processing SVN changes")
+
+    # One streamed `svn status --xml` run feeds both the log and the add/delete lists
+    unversioned, missing = svn_status_changes(repo_path, logger)
+    svn_batch("add", unversioned, repo_path, logger)
+    svn_batch("delete", missing, repo_path, logger)
+
+def commit_changes(logger, repo_path=B_REPO_PATH):
+    """Commit the target working copy."""
+    logger.log("Committing changes")
+    run_cmd(["svn", "commit", "-m", "sync update"], repo_path, logger)
+
+def paths_overlap(a, b):
+    """Whether one relative path is equal to or inside the other."""
+    a, b = os.path.normpath(a), os.path.normpath(b)
+    return a == b or a == "." or b == "." or b.startswith(a + os.sep) or a.startswith(b + os.sep)
+
+def build_sync_graph(paths, manifest, logger, src_repo=A_REPO_PATH, dst_repo=B_REPO_PATH,
+                     update_source=True):
+    """Model a sync as a DAG of stages.
+
+    Reverting/updating source (A) and target (B) run concurrently, copies
+    of disjoint paths run concurrently once both are updated, and SVN
+    add/delete and commit wait for every copy. Without update_source the
+    source working copy is copied as it is on disk.
+    """
+    graph = StageGraph(SYNC_STAGE_WORKERS, logger)
+    updates = []
+    if update_source:
+        updates.append(graph.add("update:A", lambda: svn_revert_and_update(src_repo, logger)))
+    update_b = graph.add("update:B", lambda: svn_revert_and_update(dst_repo, logger))
+    updates.append(update_b)
+
+    copies = []
+    for rel_path in paths:
+        # Overlapping paths are copied one after another, in the order given
+        deps = updates + [
+            stage for other, stage in copies if paths_overlap(other, rel_path)
+        ]
+        stage = graph.add(
+            f"copy:{rel_path}",
+            lambda rel_path=rel_path: sync_path(rel_path, manifest, logger, src_repo, dst_repo),
+            deps
         )
-        
-        for line in result.stdout.splitlines():
-            if line.startswith("?"):
-                file_path = line[1:].strip()
-                run_cmd(f"svn add \"{file_path}\"", B_REPO_PATH, logger)
-            elif line.startswith("!"):
-                file_path = line[1:].strip()
-                run_cmd(f"svn delete \"{file_path}\"", B_REPO_PATH, logger)
-
-        # 4. Commit changes
-        logger.log("Committing changes")
-        run_cmd("svn commit -m 'sync update'", B_REPO_PATH, logger)
-        logger.log("Synchronization completed successfully")
+        copies.append((rel_path, stage))
+
+    changes = graph.add(
+        "svn-changes",
+        lambda: process_svn_changes(logger, dst_repo),
+        [update_b] + [stage for _, stage in copies]
+    )
+    graph.add("commit", lambda: commit_changes(logger, dst_repo), [changes])
+    return graph
+
+def sync_paths(paths, logger, src_repo=A_REPO_PATH, dst_repo=B_REPO_PATH, update_source=True,
+               manifest_db=SYNC_MANIFEST_DB, stats=None):
+    """Main synchronization function.
+
+    With update_source False, A is not reverted/updated first, so local
+    changes in its working copy are what gets synced. If a stats dict is
+    given, per-stage (start, end) timings and the critical path are stored
+    in it. Returns a dict of path -> change summary (None for a missing
+    source path).
+    """
+    graph = None
+    trace = None
+    try:
+        with span("sync_paths", source=src_repo, target=dst_repo,
+                  paths=",".join(paths), run=logger.run_id) as trace:
+            logger.log(f"Starting synchronization process: {src_repo} -> {dst_repo}")
+            manifest = Manifest(manifest_db, f"{src_repo} -> {dst_repo}")
+            graph = build_sync_graph(paths, manifest, logger, src_repo, dst_repo, update_source)
+            results = graph.run()
+            logger.log(
+                f"Manifest: {manifest.hash_hits} cached hash(es), "
+                f"{manifest.hash_misses} computed"
+            )
+            logger.log("Synchronization completed successfully")
+            return {rel_path: results[f"copy:{rel_path}"] for rel_path in paths}
 
     except Exception as e:
         logger.log(f"Error during synchronization: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
+    finally:
+        if graph is not None and graph.timings:
+            logger.log("Stage timings:\n" + graph.format_timings())
+            if stats is not None:
+                stats["stages"] = dict(graph.timings)
+                stats["critical_path"] = graph.critical_path()
+        if trace is not None:
+            logger.log("Trace breakdown:\n" + format_breakdown(trace.trace_id))
+            if SYNC_TRACE_DIR:
+                os.makedirs(SYNC_TRACE_DIR, exist_ok=True)
+                trace_file = os.path.join(SYNC_TRACE_DIR, f"sync-{logger.run_id}.json")
+                logger.log(f"Trace written to {export_chrome_trace(trace_file, trace.trace_id)}")
@@ -0,0 +1,154 @@
+import os
+import shutil
+import hashlib
+from config.svn import SYNC_COPY_WORKERS
+from utils.fastcopy import copy_files, make_dirs
+
+SVN_META_DIR = ".svn"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def new_summary():
+    """Return an empty change summary."""
+    return {
+        "added": 0,
+        "updated": 0,
+        "removed": 0,
+        "unchanged": 0,
+        "bytes_copied": 0,
+        "copy_seconds": 0.0,
+    }
+
+def file_digest(path):
+    """Return the BLAKE2b digest of a file's content."""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def remove_path(path, summary, manifest=None):
+    """Remove a file or directory tree, counting removed files."""
+    if manifest is not None:
+        manifest.forget(path)
+    if os.path.isdir(path) and not os.path.islink(path):
+        for _, _, files in os.walk(path):
+            summary["removed"] += len(files)
+        shutil.rmtree(path)
+    else:
+        summary["removed"] += 1
+        os.remove(path)
+
+def same_content(src, src_stat, dst, dst_stat, manifest=None):
+    """Compare file contents by hash, reusing manifest hashes when possible."""
+    if manifest is None:
+        return file_digest(src) == file_digest(dst)
+    return manifest.digest(src, src_stat, file_digest) == manifest.digest(dst, dst_stat, file_digest)
+
+def plan_file(src, dst, summary, jobs, src_stat=None, manifest=None):
+    """Queue a copy of src to dst unless dst already has the same content.
+
+    Size and mtime are compared first; when only the mtime differs the
+    content hashes decide, and an identical dst just gets src's mtime so
+    the next run can skip hashing it.
+    """
+    src_stat = src_stat or os.stat(src)
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        dst_stat = None
+
+    if dst_stat is not None:
+        if src_stat.st_size == dst_stat.st_size:
+            if (src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+                    or same_content(src, src_stat, dst, dst_stat, manifest)):
+                if src_stat.st_mtime_ns != dst_stat.st_mtime_ns:
+                    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+                    if manifest is not None:
+                        manifest.record(dst, os.stat(dst), manifest.known_digest(src, src_stat))
+                summary["unchanged"] += 1
+                return
+        summary["updated"] += 1
+    else:
+        summary["added"] += 1
+
+    jobs.append((src, dst, src_stat.st_size))
+    summary["bytes_copied"] += src_stat.st_size
+
+def plan_dir(src, dst, summary, jobs, dirs, manifest=None):
+    """Walk directory src against dst, queueing copies and directories to create.
+
+    Entries that vanished from src are removed right away; .svn metadata is
+    left alone on both sides.
+    """
+    if os.path.lexists(dst) and not os.path.isdir(dst):
+        remove_path(dst, summary, manifest)
+
+    with os.scandir(src) as it:
+        src_entries = {e.name: e for e in it if e.name != SVN_META_DIR}
+    if os.path.isdir(dst):
+        with os.scandir(dst) as it:
+            dst_entries = {e.name: e for e in it if e.name != SVN_META_DIR}
+    else:
+        dirs.append(dst)
+        dst_entries = {}
+
+    # Remove what vanished from src, or changed between file and directory
+    for name, dst_entry in dst_entries.items():
+        src_entry = src_entries.get(name)
+        if src_entry is None or src_entry.is_dir() != dst_entry.is_dir():
+            remove_path(dst_entry.path, summary, manifest)
+            if manifest is not None:
+                manifest.forget(os.path.join(src, name))
+
+    for name, src_entry in src_entries.items():
+        target = os.path.join(dst, name)
+        if src_entry.is_dir():
+            plan_dir(src_entry.path, target, summary, jobs, dirs, manifest)
+        elif name in dst_entries:
+            plan_file(src_entry.path, target, summary, jobs, src_entry.stat(), manifest)
+        else:
+            summary["added"] += 1
+            size = src_entry.stat().st_size
+            summary["bytes_copied"] += size
+            jobs.append((src_entry.path, target, size))
+
+def sync_tree(src, dst, summary=None, workers=SYNC_COPY_WORKERS, manifest=None):
+    """Incrementally mirror src (a file or directory) onto dst.
+
+    Only new or changed files are copied and files that vanished from src
+    are removed, so unchanged files keep their timestamps. Directories are
+    created in one pass before the copies fan out across `workers`
+    threads. With a manifest, content hashes from previous runs are reused
+    and copied files are recorded. Returns the change summary.
+    """
+    summary = summary if summary is not None else new_summary()
+    jobs, dirs = [], []
+    if os.path.isdir(src):
+        plan_dir(src, dst, summary, jobs, dirs, manifest)
+    else:
+        if os.path.isdir(dst):
+            remove_path(dst, summary, manifest)
+        dirs.append(os.path.dirname(dst))
+        plan_file(src, dst, summary, jobs, manifest=manifest)
+
+    make_dirs(dirs)
+    if jobs:
+        stats = copy_files(jobs, workers)
+        summary["copy_seconds"] += stats["seconds"]
+        if manifest is not None:
+            for job_src, job_dst, _ in jobs:
+                src_stat = os.stat(job_src)
+                manifest.record(job_dst, os.stat(job_dst), manifest.known_digest(job_src, src_stat))
+    return summary
+
+def format_summary(summary):
+    """Format a change summary for logging."""
+    return (
+        f"{summary['added']} added, {summary['updated']} updated, "
+        f"{summary['removed']} removed, {summary['unchanged']} unchanged, "
+        f"{summary['bytes_copied']} bytes copied"
+        + (f" ({summary['added'] + summary['updated']} files, "
+           f"{summary['bytes_copied'] / summary['copy_seconds'] / 1e6:.1f} MB/s, "
+           f"{(summary['added'] + summary['updated']) / summary['copy_seconds']:.0f} files/s)"
+           if summary["copy_seconds"] else "")
+    )
@@ -0,0 +1,494 @@
+import os
+import sqlite3
+import subprocess
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from urllib.parse import quote, unquote
+from config.svn import (
+    SYNC_COMMAND_TIMEOUT, SYNC_COPY_WORKERS, URL_SYNC_STATE_DB, URL_SYNC_EXPORT_THRESHOLD
+)
+from service.tree_sync import new_summary
+from utils.process import run_command
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS url_sync_state (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    PRIMARY KEY (source, target)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS url_sync_listing (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    rel TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (source, target, rel)
+) WITHOUT ROWID;
+"""
+
+# Parent directories listed per `svn list` call in the incremental path
+LIST_CHUNK = 200
+
+def join_url(base, rel):
+    """Append a (decoded) relative path to a URL."""
+    return base.rstrip("/") + "/" + quote(rel) if rel else base.rstrip("/")
+
+def iter_xml(argv, tag, logger=None):
+    """Run an svn command with XML output and return its `tag` elements, parsed while streaming."""
+    parser = ET.XMLPullParser(events=("end",))
+    entries = []
+
+    def feed(line):
+        parser.feed(line)
+        for _, elem in parser.read_events():
+            if elem.tag == tag:
+                entries.append(elem)
+
+    run_command(
+        argv, logger=logger, on_stdout=feed, capture=False, log_stdout=False,
+        timeout=SYNC_COMMAND_TIMEOUT
+    )
+    return entries
+
+def head_revision(url, logger=None):
+    """Youngest revision of the repository holding url."""
+    entries = iter_xml(["svn", "info", "--xml", "--non-interactive", url], "entry", logger)
+    return int(entries[0].get("revision"))
+
+def exists(url):
+    """Whether url exists."""
+    try:
+        run_command(
+            ["svn", "info", "--non-interactive", url],
+            capture=False, log_stdout=False, timeout=SYNC_COMMAND_TIMEOUT
+        )
+        return True
+    except subprocess.CalledProcessError:
+        return False
+
+def entry_of(url, logger=None):
+    """Listing entry (kind, size, last changed date) of url itself; None if it does not exist."""
+    try:
+        info = iter_xml(["svn", "info", "--xml", "--non-interactive", url], "entry", logger)
+    except subprocess.CalledProcessError:
+        return None
+    if info[0].get("kind") == "dir":
+        return "dir", 0, ""
+    # `svn info` has no size for repository files; `svn list` of a file lists just the file
+    entry = iter_xml(["svn", "list", "--xml", "--non-interactive", url], "entry", logger)[0]
+    return "file", int(entry.findtext("size") or 0), entry.findtext("commit/date") or ""
+
+def tree_listing(url, logger=None):
+    """Listing of url under rel paths, with url itself as ""; {} if it does not exist.
+
+    A file URL is listed as just its "" entry.
+    """
+    root = entry_of(url, logger)
+    if root is None:
+        return {}
+    entries = listing(url, logger) if root[0] == "dir" else {}
+    entries[""] = root
+    return entries
+
+def listing(url, logger=None):
+    """Recursive listing of url as rel path -> (kind, size, last changed date); {} if it does not exist."""
+    try:
+        entries = iter_xml(
+            ["svn", "list", "--recursive", "--xml", "--non-interactive", url], "entry", logger
+        )
+    except subprocess.CalledProcessError:
+        return {}
+    return {
+        entry.findtext("name"): (
+            entry.get("kind"),
+            int(entry.findtext("size") or 0),
+            entry.findtext("commit/date") or ""
+        )
+        for entry in entries
+    }
+
+def listing_of(url, revision, rels, logger=None):
+    """Listing entries of just rels, read from their parent directories at revision.
+
+    One `svn list` (non-recursive) covers up to LIST_CHUNK parents, so the
+    cost follows the number of changed directories, not the tree size.
+    """
+    wanted = set(rels)
+    parents = sorted({os.path.dirname(rel) for rel in wanted})
+    entries = {}
+    for start in range(0, len(parents), LIST_CHUNK):
+        chunk = parents[start:start + LIST_CHUNK]
+        lists = iter_xml(
+            ["svn", "list", "--xml", "--non-interactive"]
+            + [f"{join_url(url, parent)}@{revision}" for parent in chunk],
+            "list", logger
+        )
+        # One <list> per target, in the order given
+        for parent, element in zip(chunk, lists):
+            for entry in element.iter("entry"):
+                rel = os.path.join(parent, entry.findtext("name")) if parent else entry.findtext("name")
+                if rel in wanted:
+                    entries[rel] = (
+                        entry.get("kind"),
+                        int(entry.findtext("size") or 0),
+                        entry.findtext("commit/date") or ""
+                    )
+    return entries
+
+def changed_paths(url, old_revision, new_revision, logger=None):
+    """Paths under url changed between two revisions, via `svn diff --summarize --xml`.
+
+    Returns a list of (rel path, kind, item) where item is added, modified or deleted.
+    """
+    entries = iter_xml(
+        ["svn", "diff", "--summarize", "--xml", "--non-interactive",
+         f"{url}@{old_revision}", f"{url}@{new_revision}"],
+        "path", logger
+    )
+    base = url.rstrip("/")
+    changes = []
+    for entry in entries:
+        path = entry.text or ""
+        rel = unquote(path[len(base):].lstrip("/")) if path.startswith(base) else path
+        changes.append((rel, entry.get("kind"), entry.get("item")))
+    return changes
+
+class UrlSyncState:
+    """Last source revision mirrored for each (source URL, target URL) pair.
+
+    Along with it the listing of the mirrored tree is cached, standing in
+    for a listing of the target on incremental runs. The root entry ""
+    marks a pair whose listing is cached and gives the kind of the mirrored
+    path (a file path has no other entry).
+    """
+
+    def __init__(self, db_path=URL_SYNC_STATE_DB):
+        self.db_path = db_path
+        with closing(sqlite3.connect(db_path)) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def get(self, source, target):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            row = conn.execute(
+                "SELECT revision FROM url_sync_state WHERE source = ? AND target = ?",
+                (source, target)
+            ).fetchone()
+        return row[0] if row else None
+
+    def has_listing(self, source, target):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            return conn.execute(
+                "SELECT 1 FROM url_sync_listing WHERE source = ? AND target = ? AND rel = ''",
+                (source, target)
+            ).fetchone() is not None
+
+    def lookup(self, source, target, rels):
+        """Cached listing entries of rels, as rel -> (kind, size, date)."""
+        rels = sorted(set(rels))
+        found = {}
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            for start in range(0, len(rels), 500):
+                chunk = rels[start:start + 500]
+                found.update(
+                    (rel, (kind, size, date)) for rel, kind, size, date in conn.execute(
+                        "SELECT rel, kind, size, date FROM url_sync_listing "
+                        f"WHERE source = ? AND target = ? AND rel IN ({', '.join('?' * len(chunk))})",
+                        (source, target, *chunk)
+                    )
+                )
+        return found
+
+    def set(self, source, target, revision, listing=None, removed=(), changed=None):
+        """Record revision as mirrored, with the full listing or the changes to the cached one."""
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO url_sync_state VALUES (?, ?, ?)",
+                (source, target, revision)
+            )
+            if listing is not None:
+                conn.execute(
+                    "DELETE FROM url_sync_listing WHERE source = ? AND target = ?", (source, target)
+                )
+                changed = {"": ("dir", 0, ""), **listing}
+            for rel in removed:
+                # rel and everything below it ('/' is followed by '0')
+                conn.execute(
+                    "DELETE FROM url_sync_listing WHERE source = ? AND target = ? "
+                    "AND (rel = ? OR (rel >= ? AND rel < ?))",
+                    (source, target, rel, rel + "/", rel + "0")
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO url_sync_listing VALUES (?, ?, ?, ?, ?, ?)",
+                [(source, target, rel, *entry) for rel, entry in (changed or {}).items()]
+            )
+
+class Delta:
+    """svnmucc operations mirroring one path: removals, directories to create and files to put."""
+
+    def __init__(self):
+        self.rm = set()
+        self.mkdir = set()
+        self.put = {}
+        self.summary = new_summary()
+
+    def remove(self, rel, kind):
+        self.rm.add(rel)
+        if kind == "file":
+            self.summary["removed"] += 1
+
+    def add_file(self, rel, size, existed):
+        self.put[rel] = size
+        self.summary["updated" if existed else "added"] += 1
+        self.summary["bytes_copied"] += size
+
+def _ensure_parents(delta, rel, dst):
+    """Queue mkdir for every missing parent directory of rel."""
+    parent = os.path.dirname(rel)
+    while parent and parent not in delta.mkdir and dst.get(parent, (None,))[0] != "dir":
+        delta.mkdir.add(parent)
+        parent = os.path.dirname(parent)
+
+def full_delta(src, dst):
+    """Delta between two listings.
+
+    A file is put when it is missing, changed kind, differs in size or was
+    last changed in the source after the target copy was committed.
+    """
+    delta = Delta()
+    for rel, (kind, _, _) in dst.items():
+        if rel not in src or src[rel][0] != kind:
+            delta.remove(rel, kind)
+    for rel, (kind, size, date) in src.items():
+        current = dst.get(rel)
+        same_kind = current is not None and current[0] == kind
+        if kind == "dir":
+            if not same_kind:
+                delta.mkdir.add(rel)
+        elif not same_kind or current[1] != size or current[2] < date:
+            delta.add_file(rel, size, same_kind)
+        else:
+            delta.summary["unchanged"] += 1
+    return delta
+
+def incremental_delta(changes, src, dst):
+    """Delta from a `diff --summarize` change list, checked against the target listing.
+
+    The root "" of a directory path only ever has property changes, which
+    are not mirrored; file paths are handled by the caller.
+    """
+    delta = Delta()
+    for rel, kind, item in changes:
+        if not rel:
+            continue
+        current = dst.get(rel)
+        if item == "deleted" or rel not in src:
+            if current is not None:
+                delta.remove(rel, current[0])
+            continue
+        kind = src[rel][0]
+        if current is not None and current[0] != kind:
+            delta.remove(rel, current[0])
+            current = None
+        _ensure_parents(delta, rel, dst)
+        if kind == "dir":
+            if current is None:
+                delta.mkdir.add(rel)
+        else:
+            delta.add_file(rel, src[rel][1], current is not None)
+    return delta
+
+def _prune_removals(paths):
+    """Drop removals nested inside another removed directory."""
+    kept = []
+    for path in sorted(paths, key=lambda p: (p.count("/"), p)):
+        if "" in kept:
+            break
+        if not any(path.startswith(k + "/") for k in kept):
+            kept.append(path)
+    return kept
+
+def _fetch(puts, revision, workdir, logger):
+    """Fetch the content of every (source URL, rel) in puts into workdir, returning it -> local file.
+
+    Few files are read with `svn cat`, concurrently; many files under the
+    same source path are exported in one `svn export` each.
+    """
+    files = {}
+    by_source = {}
+    for source_url, rel in puts:
+        by_source.setdefault(source_url, []).append(rel)
+
+    cats = []
+    for index, (source_url, rels) in enumerate(sorted(by_source.items())):
+        if len(rels) > URL_SYNC_EXPORT_THRESHOLD:
+            export_dir = os.path.join(workdir, f"export-{index}")
+            run_command(
+                ["svn", "export", "--quiet", "--non-interactive", "--force",
+                 f"{source_url}@{revision}", export_dir],
+                logger=logger, timeout=SYNC_COMMAND_TIMEOUT
+            )
+            for rel in rels:
+                files[(source_url, rel)] = os.path.join(export_dir, rel)
+        else:
+            cats.extend((source_url, rel) for rel in rels)
+
+    def cat(index):
+        source_url, rel = cats[index]
+        local = os.path.join(workdir, f"put-{index}")
+        with open(local, "wb") as f:
+            run_command(
+                ["svn", "cat", "--non-interactive", f"{join_url(source_url, rel)}@{revision}"],
+                stdout_file=f, timeout=SYNC_COMMAND_TIMEOUT
+            )
+        return local
+
+    with ThreadPoolExecutor(max_workers=SYNC_COPY_WORKERS) as executor:
+        for item, local in zip(cats, executor.map(cat, range(len(cats)))):
+            files[item] = local
+    return files
+
+def _ancestors(rel):
+    parent = os.path.dirname(rel)
+    while parent:
+        yield parent
+        parent = os.path.dirname(parent)
+
+def _incremental(state, src_url, dst_url, last, revision, logger):
+    """Delta since last from `diff --summarize`, listing only what changed.
+
+    Source entries come from the changed paths' parent directories; target
+    entries from the listing cached at the previous run. A file path is
+    just listed again when it changed. Returns the delta and the
+    cached-listing update (removed, changed), or None when the path changed
+    kind and needs full listings.
+    """
+    changes = changed_paths(src_url, last, revision, logger)
+    root = state.lookup(src_url, dst_url, [""])[""]
+    if root[0] == "file":
+        if not changes:
+            return Delta(), {}
+        current = entry_of(f"{src_url}@{revision}", logger)
+        if current is None or current[0] != "file":
+            return None
+        delta = full_delta({"": current}, {"": root})
+        return delta, {"changed": {"": current}}
+    if any(not rel and kind == "file" for rel, kind, _ in changes):
+        # Cached as a directory, but the path is (now) a file
+        return None
+    present = [rel for rel, _, item in changes if rel and item != "deleted"]
+    src = listing_of(src_url, revision, present, logger)
+    needed = {rel for rel, _, _ in changes if rel}
+    for rel in present:
+        needed.update(_ancestors(rel))
+    dst = state.lookup(src_url, dst_url, needed)
+    delta = incremental_delta(changes, src, dst)
+    changed = {rel: src[rel] for rel in present if rel in src}
+    changed.update((rel, ("dir", 0, "")) for rel in delta.mkdir if rel not in changed)
+    return delta, {"removed": sorted(delta.rm), "changed": changed}
+
+def url_sync(src_root, dst_root, paths, logger, state_db=URL_SYNC_STATE_DB, full=False):
+    """Mirror paths of the source URL into the target URL without working copies.
+
+    For each path the delta since the last mirrored source revision comes
+    from `svn diff --summarize`: only the changed entries are listed in the
+    source, and the target is known from the listing cached at the
+    previous run. On the first run (or with full=True) the recursive
+    listings of both sides are compared instead. A path may also be a
+    single file, mirrored with one put to its target URL. All paths are then
+    applied to the target in one atomic `svnmucc` commit, with file
+    content fetched by `svn cat` or `svn export`. If that commit fails
+    after an incremental delta (the target changed behind the cache), the
+    sync is retried once with full listings. Returns a dict of
+    path -> change summary.
+    """
+    state = UrlSyncState(state_db)
+    revision = head_revision(src_root, logger)
+    logger.log(f"URL sync {src_root}@{revision} -> {dst_root}: {', '.join(paths)}")
+
+    operations, puts, summaries, mirrored = [], [], {}, []
+    for path in paths:
+        rel_root = "" if path.strip("/") == "." else path.strip("/")
+        src_url, dst_url = join_url(src_root, rel_root), join_url(dst_root, rel_root)
+        last = None if full else state.get(src_url, dst_url)
+        if last == revision:
+            logger.log(f"{path}: already at r{revision}")
+            summaries[path] = new_summary()
+            continue
+
+        incremental = None
+        if last is not None and state.has_listing(src_url, dst_url):
+            try:
+                incremental = _incremental(state, src_url, dst_url, last, revision, logger)
+            except subprocess.CalledProcessError:
+                pass
+            if incremental is None:
+                logger.log(f"{path}: cannot diff r{last}:r{revision}, comparing listings")
+            else:
+                logger.log(f"{path}: changes r{last}:r{revision}")
+        if incremental is not None:
+            delta, cache = incremental
+        else:
+            # The root "" is listed too: its kind says whether the path is a
+            # file (mirrored with a single put to dst_url) or a directory
+            src = tree_listing(f"{src_url}@{revision}", logger)
+            if not src:
+                logger.log(f"Warning: Source path does not exist: {src_url}@{revision}")
+                summaries[path] = None
+                continue
+            dst = tree_listing(dst_url, logger)
+            delta = full_delta(src, dst)
+            cache = {"listing": src}
+            if rel_root and not dst:
+                # Create any missing parents; the path itself is in the delta
+                missing = []
+                parent = os.path.dirname(rel_root)
+                while parent and not exists(join_url(dst_root, parent)):
+                    missing.append(parent)
+                    parent = os.path.dirname(parent)
+                operations.extend(("mkdir", join_url(dst_root, p)) for p in reversed(missing))
+
+        for rel in _prune_removals(delta.rm):
+            operations.append(("rm", join_url(dst_url, rel)))
+        for rel in sorted(delta.mkdir, key=lambda p: (p.count("/"), p)):
+            operations.append(("mkdir", join_url(dst_url, rel)))
+        puts.extend((src_url, dst_url, rel) for rel in sorted(delta.put))
+        summaries[path] = delta.summary
+        mirrored.append((src_url, dst_url, cache))
+
+    with tempfile.TemporaryDirectory(prefix="url-sync-") as workdir:
+        if puts:
+            files = _fetch([(s, rel) for s, _, rel in puts], revision, workdir, logger)
+            operations.extend(
+                ("put", files[(s, rel)], join_url(d, rel)) for s, d, rel in puts
+            )
+
+        if operations:
+            # Removals come first so that changes of kind can be re-created
+            operations.sort(key=lambda op: {"rm": 0, "mkdir": 1, "put": 2}[op[0]])
+            args_file = os.path.join(workdir, "operations")
+            with open(args_file, "w", encoding="utf-8") as f:
+                for op in operations:
+                    f.write("\n".join(op) + "\n")
+            logger.log(f"svnmucc: {len(operations)} operation(s)")
+            try:
+                run_command(
+                    ["svnmucc", "--non-interactive",
+                     "-m", f"sync update from {src_root}@{revision}",
+                     "--extra-args", args_file],
+                    logger=logger, timeout=SYNC_COMMAND_TIMEOUT
+                )
+            except subprocess.CalledProcessError:
+                if full or all("listing" in cache for _, _, cache in mirrored):
+                    raise
+                logger.log("Commit failed against the cached target listing, retrying with full listings")
+                return url_sync(src_root, dst_root, paths, logger, state_db, full=True)
+        else:
+            logger.log("No changes to commit")
+
+    for src_url, dst_url, cache in mirrored:
+        state.set(src_url, dst_url, revision, **cache)
+    return summaries
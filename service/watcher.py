@@ -0,0 +1,290 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from service.tree_sync import SVN_META_DIR
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+def _watched_dirs(root):
+    """Yield root and every directory below it, skipping .svn metadata."""
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != SVN_META_DIR]
+        yield dirpath
+
+class InotifyWatcher:
+    """Recursive directory watcher on top of Linux inotify, via ctypes.
+
+    read() returns the set of paths touched since the last call. New
+    directories are watched as they appear. Roots that are not directories
+    are watched through their parent directory, keeping only events for
+    their own name, so replacing or recreating the file is seen too. On
+    queue overflow the watched roots themselves are reported, so callers
+    fall back to syncing them whole.
+    """
+
+    def __init__(self, roots):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = list(roots)
+        self.dirs = {}
+        # wd -> names whose events are kept, for directories watched only
+        # on behalf of file roots (absent: every entry counts)
+        self.names = {}
+        for root in self.roots:
+            self.add_tree(root)
+
+    def add_watch(self, path, name=None):
+        """Watch directory path, or only its entry name when given."""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(err, f"inotify_add_watch failed for {path}")
+        # The same directory may be watched for a tree and for file roots
+        if name is None:
+            self.names.pop(wd, None)
+        elif wd in self.names or wd not in self.dirs:
+            self.names.setdefault(wd, set()).add(name)
+        self.dirs[wd] = path
+
+    def add_tree(self, root):
+        if os.path.isdir(root):
+            for path in _watched_dirs(root):
+                self.add_watch(path)
+        else:
+            parent, name = os.path.split(os.path.normpath(root))
+            self.add_watch(parent or ".", name)
+
+    def read(self, timeout=None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self.roots)
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                self.names.pop(wd, None)
+                continue
+            base = self.dirs.get(wd)
+            if base is None:
+                continue
+            names = self.names.get(wd)
+            if names is not None:
+                if name:
+                    if os.fsdecode(name) in names:
+                        changed.add(os.path.join(base, os.fsdecode(name)))
+                else:
+                    # The parent itself moved or vanished: report its file roots
+                    changed.update(os.path.join(base, n) for n in names)
+                continue
+            path = os.path.join(base, os.fsdecode(name)) if name else base
+            if SVN_META_DIR in path.split(os.sep):
+                continue
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # Files created before the watch was added are caught by the sync itself
+                self.add_tree(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingWatcher:
+    """Portable fallback that diffs (mtime, size) snapshots of the roots."""
+
+    def __init__(self, roots, interval=2.0):
+        self.roots = list(roots)
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        for root in self.roots:
+            if os.path.isfile(root):
+                st = os.stat(root)
+                snapshot[root] = (st.st_mtime_ns, st.st_size)
+                continue
+            for dirpath in _watched_dirs(root):
+                with os.scandir(dirpath) as it:
+                    for entry in it:
+                        if entry.name == SVN_META_DIR:
+                            continue
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except FileNotFoundError:
+                            continue
+                        snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def read(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self.scan()
+        changed = {
+            path for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+def create_watcher(roots, poll_interval=2.0):
+    """Return an inotify watcher, or a polling one where inotify is unavailable."""
+    try:
+        return InotifyWatcher(roots)
+    except (OSError, AttributeError):
+        return PollingWatcher(roots, poll_interval)
+
+def affected_paths(changed, src_repo, rel_paths):
+    """Map changed absolute paths to the smallest set of sync paths covering them.
+
+    A change is synced through its parent directory, so that deletions and
+    renames are mirrored, but never above the configured path containing it.
+    """
+    roots = [os.path.normpath(p) for p in rel_paths]
+    affected = set()
+    for path in changed:
+        rel = os.path.relpath(path, src_repo)
+        root = next(
+            (r for r in roots if r == "." or rel == r or rel.startswith(r + os.sep)),
+            None
+        )
+        if root is None:
+            continue
+        parent = os.path.dirname(rel)
+        if rel == root or not (root == "." or parent == root or parent.startswith(root + os.sep)):
+            parent = root
+        affected.add(parent or ".")
+
+    # Drop paths nested inside another affected path
+    result = []
+    for path in sorted(affected, key=lambda p: (p.count(os.sep), p)):
+        if not any(p == "." or path.startswith(p + os.sep) for p in result):
+            result.append(path)
+    return sorted(result)
+
+class SyncWatcher:
+    """Continuously sync one pair, driven by file system events and new revisions.
+
+    File changes under the pair's source paths are debounced: a sync starts
+    once no event arrived for `debounce` seconds (or `max_delay` seconds
+    after the first one) and covers only the affected directories, copying
+    the source working copy as it is. With `revision_interval`, `svn info
+    -r HEAD` is polled on the source and a new revision triggers a sync of
+    all paths that first updates the source.
+    """
+
+    def __init__(self, pair, sync, logger, debounce=1.0, max_delay=10.0,
+                 revision_interval=None, poll_interval=2.0, client=None):
+        self.pair = pair
+        self.sync = sync
+        self.logger = logger
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.revision_interval = revision_interval
+        self.poll_interval = poll_interval
+        self.client = client
+        self.stop_event = threading.Event()
+        self.revision = None
+
+    def head_revision(self):
+        info = self.client.info(self.pair.source, "HEAD") if self.client else None
+        return int(info["revision"]) if info and info.get("revision") else None
+
+    def run_sync(self, paths, update_source):
+        try:
+            self.sync(self.pair, paths, update_source)
+        except Exception as e:
+            self.logger.log(f"Sync of {', '.join(paths)} failed: {str(e)}")
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        roots = [os.path.join(self.pair.source, p) for p in self.pair.paths]
+        watcher = create_watcher(roots, self.poll_interval)
+        self.logger.log(
+            f"Watching {len(roots)} path(s) of {self.pair.source} "
+            f"with {type(watcher).__name__}"
+        )
+        if self.revision_interval:
+            self.revision = self.head_revision()
+        next_revision_check = time.monotonic() + (self.revision_interval or 0)
+        pending = set()
+        first_event = last_event = None
+
+        try:
+            while not self.stop_event.is_set():
+                changed = watcher.read(timeout=min(self.debounce, 1.0))
+                now = time.monotonic()
+                if changed:
+                    pending |= changed
+                    first_event = first_event or now
+                    last_event = now
+
+                if pending and (now - last_event >= self.debounce or now - first_event >= self.max_delay):
+                    paths = affected_paths(pending, self.pair.source, self.pair.paths)
+                    pending.clear()
+                    first_event = last_event = None
+                    if paths:
+                        self.logger.log(f"Change detected, syncing: {', '.join(paths)}")
+                        self.run_sync(paths, update_source=False)
+
+                if self.revision_interval and now >= next_revision_check:
+                    next_revision_check = now + self.revision_interval
+                    revision = self.head_revision()
+                    if revision is not None and self.revision is not None and revision > self.revision:
+                        self.logger.log(f"New revision r{revision} in {self.pair.source}, syncing all paths")
+                        self.run_sync(self.pair.paths, update_source=True)
+                    if revision is not None:
+                        self.revision = revision
+        finally:
+            watcher.close()
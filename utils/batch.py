@@ -0,0 +1,78 @@
+import json
+import shlex
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from functools import partial
+from config.main import BATCH_POOL, BATCH_WORKERS
+from utils.daemon import install_output, run_captured
+
+BATCH_POOLS = ("thread", "process")
+
+def read_jobs(source):
+    """Jobs of a batch file, or of stdin when source is "-", as (line number, text) pairs.
+
+    Each job is one `module.function args...` line, quoted as in a shell;
+    blank lines and lines starting with # are skipped.
+    """
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [
+        (number, line.strip()) for number, line in enumerate(lines, 1)
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+def run_job(run, job):
+    """Run one (line number, text) job with run(argv) and return its result record."""
+    number, text = job
+    started = time.monotonic()
+    try:
+        argv = shlex.split(text)
+    except ValueError as e:
+        status, output, result = 1, f"Error: Cannot parse job: {e}\n", None
+    else:
+        status, output, result = run_captured(run, argv)
+    try:
+        json.dumps(result)
+    except (TypeError, ValueError):
+        result = repr(result)
+    lines = output.strip().splitlines()
+    return {
+        "line": number,
+        "job": text,
+        "ok": status == 0,
+        "status": status,
+        "result": result,
+        "output": output,
+        "error": lines[-1] if status and lines else None,
+        "duration": round(time.monotonic() - started, 4),
+    }
+
+def run_batch(run, jobs, pool=BATCH_POOL, workers=BATCH_WORKERS, out=None):
+    """Run jobs concurrently, writing one JSON line per job to out as each finishes.
+
+    A failing job does not stop the others. With the "process" pool run
+    must be picklable, i.e. a module-level function. Returns the number of
+    failed jobs. Worker processes install the output capture themselves,
+    since under spawn they do not inherit it from this one.
+    """
+    if pool not in BATCH_POOLS:
+        raise ValueError(f"Unknown batch pool: {pool}")
+    stdout, stderr = install_output()
+    out = out or stdout
+    executor_class = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+    failed = 0
+    try:
+        with executor_class(max_workers=max(1, workers), initializer=install_output) as executor:
+            futures = [executor.submit(partial(run_job, run), job) for job in jobs]
+            for future in as_completed(futures):
+                record = future.result()
+                failed += not record["ok"]
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+    return failed
@@ -0,0 +1,239 @@
+import io
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import threading
+import time
+import traceback
+from config.main import DAEMON_SOCKET, DAEMON_WORKERS, DAEMON_IDLE_TIMEOUT
+
+class ThreadOutput(io.TextIOBase):
+    """Stand-in for sys.stdout/sys.stderr sending each thread's writes to its own buffer.
+
+    Threads that have not called capture() write to the wrapped stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer):
+        self._local.buffer = buffer
+
+    def release(self):
+        self._local.buffer = None
+
+    def _target(self):
+        buffer = getattr(self._local, "buffer", None)
+        return self.stream if buffer is None else buffer
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def writable(self):
+        return True
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, "encoding", "utf-8")
+
+def _private_dir(path):
+    """Whether directory path belongs to this user and no one else can write to it."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+def _peer_uid(conn):
+    """uid of the process at the other end of a Unix socket, or None where unsupported."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+def _connect(socket_path):
+    """Connect to a daemon run by this user; None if there is none (or it is someone else's)."""
+    try:
+        st = os.stat(socket_path)
+    except OSError:
+        return None
+    if (not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid()
+            or not _private_dir(os.path.dirname(socket_path) or ".")):
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path)
+        uid = _peer_uid(conn)
+    except OSError:
+        conn.close()
+        return None
+    if uid is not None and uid != os.getuid():
+        conn.close()
+        return None
+    return conn
+
+def _send(conn, message):
+    conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+def _receive(conn):
+    with conn.makefile("rb") as f:
+        line = f.readline()
+    return json.loads(line) if line else None
+
+def install_output():
+    """Wrap sys.stdout and sys.stderr in ThreadOutput unless already done; returns the previous pair."""
+    previous = sys.stdout, sys.stderr
+    if not isinstance(sys.stdout, ThreadOutput):
+        sys.stdout = ThreadOutput(sys.stdout)
+    if not isinstance(sys.stderr, ThreadOutput):
+        sys.stderr = ThreadOutput(sys.stderr)
+    return previous
+
+def run_captured(run, argv):
+    """Call run(argv) with this thread's output captured (see install_output).
+
+    Returns (exit status, output, return value); sys.exit() and uncaught
+    exceptions become a status, as they would for a separate process.
+    """
+    output = io.StringIO()
+    sys.stdout.capture(output)
+    sys.stderr.capture(output)
+    status, result = 0, None
+    try:
+        result = run(argv)
+    except SystemExit as e:
+        if isinstance(e.code, int) or e.code is None:
+            status = e.code or 0
+        else:
+            output.write(f"{e.code}\n")
+            status = 1
+    except Exception:
+        traceback.print_exc(file=output)
+        status = 1
+    finally:
+        sys.stdout.release()
+        sys.stderr.release()
+    return status, output.getvalue(), result
+
+def _execute(run, request):
+    """Run one request's argv and build the reply."""
+    if request.get("cwd") != os.getcwd():
+        # Actions resolve relative paths against the working directory,
+        # which is shared by the whole daemon
+        return {"status": None, "error": f"daemon runs in {os.getcwd()}"}
+    status, output, _ = run_captured(run, request["argv"])
+    return {"status": status, "output": output}
+
+def serve(run, socket_path=DAEMON_SOCKET, workers=DAEMON_WORKERS, idle_timeout=DAEMON_IDLE_TIMEOUT):
+    """Run argv lists sent by forward() with run(argv), several at a time, until idle.
+
+    Modules imported by one request stay loaded for the next. stdout and
+    stderr written by the request's own thread are sent back with its exit
+    status; output of threads it starts goes to the daemon's own stdout.
+    Exits after idle_timeout seconds without requests (0: never).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    socket_dir = os.path.dirname(socket_path) or "."
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if not _private_dir(socket_dir):
+        raise RuntimeError(f"Socket directory {socket_dir} must belong to you and not be writable by others")
+    existing = _connect(socket_path)
+    if existing is not None:
+        existing.close()
+        raise RuntimeError(f"A daemon is already listening on {socket_path}")
+    if os.path.lexists(socket_path):
+        os.unlink(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Created 0600 from the start: no window where others can connect
+    umask = os.umask(0o177)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(umask)
+    server.listen(128)
+    server.settimeout(1.0)
+
+    lock = threading.Lock()
+    state = {"active": 0, "last": time.monotonic()}
+
+    def handle(conn):
+        try:
+            with conn:
+                try:
+                    reply = _execute(run, _receive(conn))
+                except Exception as e:
+                    reply = {"status": None, "error": str(e)}
+                _send(conn, reply)
+        except OSError:
+            pass
+        finally:
+            with lock:
+                state["active"] -= 1
+                state["last"] = time.monotonic()
+
+    def submit(conn):
+        conn.settimeout(None)
+        with lock:
+            state["active"] += 1
+        executor.submit(handle, conn)
+
+    stdout, stderr = install_output()
+    stdout.write(f"Daemon listening on {socket_path} ({workers} workers)\n")
+    stdout.flush()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            while True:
+                try:
+                    submit(server.accept()[0])
+                    continue
+                except socket.timeout:
+                    pass
+                with lock:
+                    idle = not state["active"] and time.monotonic() - state["last"] >= idle_timeout
+                if idle_timeout and idle:
+                    break
+
+            # New clients fall back to running locally once the socket is
+            # gone; the ones already queued are still served
+            os.unlink(socket_path)
+            server.setblocking(False)
+            while True:
+                try:
+                    submit(server.accept()[0])
+                except BlockingIOError:
+                    break
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def forward(argv, socket_path=DAEMON_SOCKET):
+    """Run argv on the daemon and return (exit status, output).
+
+    Returns None when no daemon is listening or it cannot run the request,
+    so the caller can run it locally instead.
+    """
+    conn = _connect(socket_path)
+    if conn is None:
+        return None
+    with conn:
+        try:
+            _send(conn, {"argv": list(argv), "cwd": os.getcwd()})
+        except OSError:
+            return None
+        reply = _receive(conn)
+    if reply is None:
+        return 1, "Error: daemon closed the connection\n"
+    if reply["status"] is None:
+        return None
+    return reply["status"], reply["output"]
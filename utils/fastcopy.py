@@ -0,0 +1,96 @@
+import os
+import errno
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Errors meaning "this copy primitive is not usable here", not a real I/O failure
+_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+_CHUNK_SIZE = 1 << 30
+
+def _copy_file_range(infd, outfd):
+    """Copy with copy_file_range(2); returns False when it is unsupported."""
+    copied = 0
+    try:
+        while True:
+            n = os.copy_file_range(infd, outfd, _CHUNK_SIZE)
+            if n == 0:
+                # Some filesystems report 0 instead of an error; fall back
+                # unless the source really is empty
+                return copied > 0 or os.fstat(infd).st_size == 0
+            copied += n
+    except OSError as e:
+        if copied == 0 and e.errno in _UNSUPPORTED:
+            return False
+        raise
+
+def _sendfile(infd, outfd):
+    """Copy with sendfile(2); returns False when it is unsupported."""
+    offset = 0
+    try:
+        while True:
+            n = os.sendfile(outfd, infd, offset, _CHUNK_SIZE)
+            if n == 0:
+                return offset > 0 or os.fstat(infd).st_size == 0
+            offset += n
+    except OSError as e:
+        if offset == 0 and e.errno in _UNSUPPORTED:
+            return False
+        raise
+
+def copy_file(src, dst):
+    """Copy src to dst in the kernel where possible and preserve metadata like copy2.
+
+    The data goes to a temporary file next to dst, renamed over it at the
+    end, so read-only destinations (svn:needs-lock files) can be replaced
+    and a failed copy never leaves dst half written.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(dst)}.", suffix=".tmp",
+                               dir=os.path.dirname(dst) or ".")
+    try:
+        with open(src, "rb") as fsrc, open(fd, "wb") as fdst:
+            infd, outfd = fsrc.fileno(), fdst.fileno()
+            done = hasattr(os, "copy_file_range") and _copy_file_range(infd, outfd)
+            if not done:
+                done = hasattr(os, "sendfile") and _sendfile(infd, outfd)
+            if not done:
+                shutil.copyfileobj(fsrc, fdst)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+def make_dirs(dirs):
+    """Create all directories up front, parents first."""
+    for path in sorted(set(dirs)):
+        os.makedirs(path, exist_ok=True)
+
+def copy_files(jobs, workers=8):
+    """Copy (src, dst, size) jobs across a thread pool.
+
+    Destination directories must already exist. Returns throughput stats.
+    """
+    jobs = list(jobs)
+    started = time.monotonic()
+    if workers <= 1 or len(jobs) <= 1:
+        for src, dst, _ in jobs:
+            copy_file(src, dst)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() re-raises the first copy error, if any
+            list(executor.map(lambda job: copy_file(job[0], job[1]), jobs))
+    elapsed = time.monotonic() - started
+
+    total_bytes = sum(size for _, _, size in jobs)
+    return {
+        "files": len(jobs),
+        "bytes": total_bytes,
+        "seconds": elapsed,
+        "files_per_sec": len(jobs) / elapsed if elapsed else 0.0,
+        "bytes_per_sec": total_bytes / elapsed if elapsed else 0.0,
+    }
@@ -1,24 +1,506 @@
+import os
 import sys
+import time
+import json
+import gzip
+import glob
+import queue
+import shutil
+import atexit
+import fcntl
 import threading
-from datetime import datetime
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from config.main import LOG_FORMAT, LOG_MAX_BYTES, LOG_ROTATE_INTERVAL, LOG_BACKUP_COUNT
+
+# Background writer: seconds between flushes, and buffered bytes that force one
+FLUSH_INTERVAL = 1.0
+FLUSH_BYTES = 64 * 1024
+
+# Records kept in memory per logger; older ones are dropped
+MAX_RECORDS = 10000
+
+_time_cache = (None, "")
+
+def format_time(ts):
+    """Format a timestamp as local "%Y-%m-%d %H:%M:%S", once per second."""
+    global _time_cache
+    second = int(ts)
+    cached_second, text = _time_cache
+    if cached_second != second:
+        text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+        _time_cache = (second, text)
+    return text
+
+class LogRecord:
+    """One log message; formatted only when read or written."""
+
+    __slots__ = ("ts", "level", "msg", "stage", "duration")
+
+    def __init__(self, ts, level, msg, stage=None, duration=None):
+        self.ts = ts
+        self.level = level
+        self.msg = msg
+        self.stage = stage
+        self.duration = duration
+
+    def format(self, prefix=""):
+        if self.level == "INFO":
+            return f"[{format_time(self.ts)}] {prefix}{self.msg}"
+        return f"[{format_time(self.ts)}] {self.level} {prefix}{self.msg}"
+
+    def to_json(self, prefix="", run_id=None):
+        entry = {"ts": round(self.ts, 6), "time": format_time(self.ts), "level": self.level}
+        if run_id:
+            entry["run"] = run_id
+        if prefix:
+            entry["source"] = prefix.strip().strip("[]")
+        if self.stage:
+            entry["stage"] = self.stage
+        if self.duration is not None:
+            entry["duration"] = round(self.duration, 6)
+        entry["msg"] = str(self.msg)
+        return json.dumps(entry, ensure_ascii=False)
+
+class _Compressor:
+    """Gzips rotated log files on its own thread, then prunes old ones."""
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, path, base, backup_count):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="log-compressor", daemon=True)
+                self.thread.start()
+        self.queue.put((path, base, backup_count))
+
+    def close(self):
+        with self.lock:
+            thread = self.thread
+        if thread is not None and thread.is_alive():
+            self.queue.put(None)
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            path, base, backup_count = item
+            try:
+                try:
+                    src = open(path, "rb")
+                except FileNotFoundError:
+                    # Already pruned, or compressed by another process
+                    src = None
+                if src is not None:
+                    with src, gzip.open(path + ".gz.tmp", "wb") as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                    os.replace(path + ".gz.tmp", path + ".gz")
+                    os.remove(path)
+                prune_backups(base, backup_count)
+            except OSError as e:
+                sys.stderr.write(f"Cannot compress log file {path}: {e}\n")
+
+_compressor = _Compressor()
+
+@contextmanager
+def _file_lock(base):
+    """Exclusive flock on <base>.lock, serializing every process that writes the log file base."""
+    with open(base + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+def _segment_of(base, path):
+    name = path[len(base) + 1:]
+    return name[:-3] if name.endswith(".gz") else name
+
+def rotated_files(base):
+    """Rotated segments of the log file base, oldest first."""
+    files = [
+        path for path in glob.glob(glob.escape(base) + ".*")
+        if not path.endswith((".index", ".segment", ".lock", ".tmp"))
+    ]
+    return sorted(files, key=lambda path: _segment_of(base, path))
+
+def prune_backups(base, backup_count):
+    """Delete all but the newest backup_count rotated segments, and their index entries."""
+    if backup_count <= 0:
+        return
+    files = rotated_files(base)
+    for path in files[:-backup_count]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    if len(files) > backup_count:
+        _prune_index(base)
+
+def _prune_index(base):
+    """Drop index entries pointing at segments that no longer exist."""
+    index_path = base + ".index"
+    with _file_lock(base):
+        live = {_segment_of(base, path) for path in rotated_files(base)}
+        live.add(_active_segment(base))
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        kept = [line for line in lines if json.loads(line).get("segment") in live]
+        if len(kept) < len(lines):
+            with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+                f.writelines(kept)
+            os.replace(index_path + ".tmp", index_path)
+
+def _new_segment(base):
+    """Id for a new segment of base, sorting after every rotated one; needs the file lock.
+
+    Local time down to the nanosecond; if the clock went back, the newest
+    existing id with "-1" appended.
+    """
+    seconds, fraction = divmod(time.time_ns(), 1_000_000_000)
+    segment = time.strftime("%Y%m%d-%H%M%S", time.localtime(seconds)) + f"-{fraction:09d}"
+    rotated = rotated_files(base)
+    newest = _segment_of(base, rotated[-1]) if rotated else ""
+    return segment if segment > newest else newest + "-1"
+
+class LogWriter:
+    """Appends lines to one file, safely shared with other processes.
+
+    write() takes a string or a (LogRecord, prefix, run id) tuple, written
+    as text or as JSON lines. With threaded=True it only enqueues the item:
+    a background thread formats queued items in batches and appends them
+    every `flush_interval` seconds or once `flush_bytes` are buffered;
+    flush() blocks until everything written so far is on disk, and close()
+    flushes and stops the thread. Otherwise write() appends immediately.
+
+    Every append holds an flock on `<path>.lock` and first reopens the file
+    if another process rotated it, so processes sharing the log never write
+    into a rotated file. The file is rotated to `<path>.<segment>` once it
+    reaches `max_bytes` or its segment is older than `rotate_interval`
+    seconds, and rotated files are gzipped in the background, keeping
+    `backup_count` of them. In JSON format, `<path>.index` records where
+    each run's entries start in each segment, for read_run().
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL, flush_bytes=FLUSH_BYTES,
+                 fmt=LOG_FORMAT, max_bytes=LOG_MAX_BYTES, rotate_interval=LOG_ROTATE_INTERVAL,
+                 backup_count=LOG_BACKUP_COUNT, threaded=True):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.closed = False
+        self.error = None
+        self.io_lock = threading.Lock()
+        # Opened here so that an unwritable log file fails the caller
+        with _file_lock(path):
+            self._open()
+        self.thread = None
+        if threaded:
+            self.queue = queue.SimpleQueue()
+            self.thread = threading.Thread(target=self._run, name=f"log-writer:{path}", daemon=True)
+            self.thread.start()
+
+    def write(self, item):
+        if self.thread is None:
+            with self.io_lock:
+                self._commit([self._encode(item)])
+        elif self.error is None:
+            self.queue.put(item)
+
+    def flush(self, timeout=None):
+        """Wait for everything written so far; raises if the writer thread has died."""
+        if self.thread is None or self.closed:
+            return
+        if self.error is None:
+            done = threading.Event()
+            self.queue.put(done)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not done.wait(0.5) and self.thread.is_alive():
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+        if self.error is not None:
+            raise RuntimeError(f"Log writer for {self.path} failed: {self.error}") from self.error
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.thread is None:
+            with self.io_lock:
+                self.file.close()
+            return
+        self.queue.put(self._CLOSE)
+        self.thread.join()
+
+    def _open(self):
+        """Open the active file and pick up (or start) its segment id; needs the file lock."""
+        marker = self.path + ".segment"
+        existed = os.path.exists(self.path)
+        self.file = open(self.path, "ab")
+        self.runs = set()
+        segment = None
+        if existed and os.path.exists(marker):
+            with open(marker, encoding="utf-8") as f:
+                segment = f.read().strip() or None
+        if segment is None:
+            segment = _new_segment(self.path)
+            with open(marker, "w", encoding="utf-8") as f:
+                f.write(segment)
+        self.segment = segment
+
+    def _reopen_if_rotated(self):
+        try:
+            rotated = os.stat(self.path).st_ino != os.fstat(self.file.fileno()).st_ino
+        except FileNotFoundError:
+            rotated = True
+        if rotated:
+            self.file.close()
+            self._open()
+
+    def _rotate_if_due(self, size):
+        marker = self.path + ".segment"
+        age = time.time() - os.stat(marker).st_mtime
+        if not size or not ((self.max_bytes and size >= self.max_bytes) or
+                            (self.rotate_interval and age >= self.rotate_interval)):
+            return
+        self.file.close()
+        rotated = f"{self.path}.{self.segment}"
+        os.replace(self.path, rotated)
+        os.remove(marker)
+        self._open()
+        _compressor.submit(rotated, self.path, self.backup_count)
+
+    def _encode(self, item):
+        """Encode one item as (bytes, run id to index or None)."""
+        if isinstance(item, str):
+            return item.encode("utf-8"), None
+        record, prefix, run_id = item
+        if self.fmt != "json":
+            return (record.format(prefix) + "\n").encode("utf-8"), None
+        return (record.to_json(prefix, run_id) + "\n").encode("utf-8"), run_id
+
+    def _commit(self, batch):
+        """Append a batch of encoded entries under the file lock, then rotate if due."""
+        try:
+            with _file_lock(self.path):
+                self._reopen_if_rotated()
+                offset = os.fstat(self.file.fileno()).st_size
+                index = []
+                for data, run_id in batch:
+                    if run_id and run_id not in self.runs:
+                        self.runs.add(run_id)
+                        index.append(json.dumps({"run": run_id, "segment": self.segment, "offset": offset}) + "\n")
+                    offset += len(data)
+                self.file.write(b"".join(data for data, _ in batch))
+                self.file.flush()
+                if index:
+                    with open(self.path + ".index", "a", encoding="utf-8") as f:
+                        f.writelines(index)
+                self._rotate_if_due(offset)
+        except OSError as e:
+            sys.stderr.write(f"Cannot write log file {self.path}: {e}\n")
+
+    def _run(self):
+        pending, size = [], 0
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = None
+
+                # Drain whatever else is queued into one batch
+                waiters, closing = [], False
+                while item is not None:
+                    if item is self._CLOSE:
+                        closing = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        entry = self._encode(item)
+                        pending.append(entry)
+                        size += len(entry[0])
+                    if size >= self.flush_bytes:
+                        break
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+
+                now = time.monotonic()
+                if pending and (waiters or closing or size >= self.flush_bytes
+                                or now - last_flush >= self.flush_interval):
+                    self._commit(pending)
+                    pending, size = [], 0
+                    last_flush = now
+                for waiter in waiters:
+                    waiter.set()
+                if closing:
+                    return
+        except BaseException as e:
+            self.error = e
+            sys.stderr.write(f"Log writer for {self.path} stopped: {e}\n")
+        finally:
+            self.file.close()
+
+def _active_segment(path):
+    try:
+        with open(path + ".segment", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def read_run(path, run_id):
+    """Yield the JSON entries of one run from a JSON-lines log and its rotated segments.
+
+    The index gives, per segment, the offset of the run's first entry, so
+    only the part of each segment from there on is read.
+    """
+    try:
+        with open(path + ".index", encoding="utf-8") as f:
+            starts = [json.loads(line) for line in f if f'"{run_id}"' in line]
+    except FileNotFoundError:
+        return
+    for start in starts:
+        if start.get("run") != run_id:
+            continue
+        segment_path = f"{path}.{start['segment']}"
+        if os.path.exists(segment_path):
+            f = open(segment_path, "rb")
+        elif os.path.exists(segment_path + ".gz"):
+            f = gzip.open(segment_path + ".gz", "rb")
+        elif _active_segment(path) == start["segment"]:
+            f = open(path, "rb")
+        else:
+            # The segment was pruned
+            continue
+        with f:
+            f.seek(start["offset"])
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("run") == run_id:
+                    yield entry
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_writer(path, threaded=True):
+    """Return the writer shared by every logger of the file at path."""
+    key = (os.path.abspath(path), threaded)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer.closed:
+            writer = _writers[key] = LogWriter(path, threaded=threaded)
+        return writer
+
+@atexit.register
+def close_writers():
+    """Flush and close every shared writer, then finish compressing; runs at interpreter exit."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+    _compressor.close()
 
 class SyncLogger:
-    def __init__(self, log_file, to_stdout=True):
+    """Logs to a file (and optionally stdout), keeping the latest records in memory.
+
+    Records are kept in a ring buffer of `max_records`; each has a sequence
+    number counting every message ever logged, so callers can page through
+    what is still buffered or tail it. Every logger has a run id, written
+    with each entry in JSON format together with the current stage.
+    """
+
+    def __init__(self, log_file, to_stdout=True, prefix="", async_write=True,
+                 max_records=MAX_RECORDS, run_id=None):
         self.log_file = log_file
         self.to_stdout = to_stdout
-        self.logs = []
+        self.prefix = prefix
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = deque(maxlen=max_records)
+        self.total = 0
         self.lock = threading.Lock()
+        self.local = threading.local()
+        self.async_write = async_write
+        self.writer = get_writer(log_file, async_write)
+
+    @contextmanager
+    def stage(self, name):
+        """Tag messages logged by this thread inside the block with stage name."""
+        previous = getattr(self.local, "stage", None)
+        self.local.stage = name
+        try:
+            yield
+        finally:
+            self.local.stage = previous
+
+    def log(self, msg, level="INFO", stage=None, duration=None):
+        record = LogRecord(time.time(), level, msg, stage or getattr(self.local, "stage", None), duration)
+        with self.lock:
+            self.records.append(record)
+            self.total += 1
+
+        if self.async_write:
+            if self.to_stdout:
+                sys.stdout.write(record.format(self.prefix) + "\n")
+            self.writer.write((record, self.prefix, self.run_id))
+            return
 
-    def log(self, msg):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_msg = f"[{timestamp}] {msg}"
-        
         with self.lock:
-            self.logs.append(log_msg)
             if self.to_stdout:
-                print(log_msg)
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(log_msg + "\n")
+                print(record.format(self.prefix))
+            self.writer.write((record, self.prefix, self.run_id))
+
+    @property
+    def dropped(self):
+        """Number of records that fell out of the buffer."""
+        with self.lock:
+            return self.total - len(self.records)
+
+    def page(self, start=0, count=None):
+        """Return (lines, next_start) for buffered records from sequence number start on.
+
+        Records already dropped from the buffer are skipped; pass next_start
+        back in to read only what was logged since.
+        """
+        with self.lock:
+            records = list(self.records)
+            first = self.total - len(records)
+        offset = max(start - first, 0)
+        selected = records[offset:] if count is None else records[offset:offset + count]
+        return [r.format(self.prefix) for r in selected], first + offset + len(selected)
+
+    def tail(self, count=100):
+        """Return the last count formatted lines."""
+        with self.lock:
+            records = list(self.records)[-count:] if count else []
+        return [r.format(self.prefix) for r in records]
+
+    def flush(self):
+        """Wait until every message logged so far is written to the log file."""
+        self.writer.flush()
+
+    def close(self):
+        """Flush the log file; the shared writer itself stays open for other loggers."""
+        self.flush()
 
-    def get_logs(self):
-        return "\n".join(self.logs) 
\ No newline at end of file
+    def get_logs(self, start=0, count=None):
+        """Buffered log lines joined into one string, optionally just one page."""
+        return "\n".join(self.page(start, count)[0])
@@ -0,0 +1,141 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+from utils.tracing import span
+
+_spawn_lock = threading.Lock()
+_spawn_count = 0
+
+def spawn_count():
+    """Number of processes started by run_command so far, for benchmarks."""
+    return _spawn_count
+
+class CommandResult:
+    """Outcome of a command run through run_command."""
+
+    __slots__ = ("argv", "cwd", "returncode", "stdout", "stderr", "duration", "timed_out")
+
+    def __init__(self, argv, cwd, returncode, stdout, stderr, duration, timed_out):
+        self.argv = argv
+        self.cwd = cwd
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.timed_out = timed_out
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out
+
+    def __repr__(self):
+        return (
+            f"CommandResult(argv={self.argv!r}, returncode={self.returncode}, "
+            f"duration={self.duration:.3f}, timed_out={self.timed_out})"
+        )
+
+def _kill_group(process):
+    """Kill the process and everything it spawned."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def _pump(stream, sinks, lines):
+    """Forward each line of stream to every sink, optionally keeping it."""
+    for line in stream:
+        for sink in sinks:
+            sink(line)
+        if lines is not None:
+            lines.append(line)
+    stream.close()
+
+def run_command(argv, cwd=None, logger=None, on_stdout=None, on_stderr=None,
+                timeout=None, check=True, capture=True, log_stdout=True, stdout_file=None):
+    """Run argv without a shell, streaming its output line by line as it arrives.
+
+    stdout lines go to the logger (unless log_stdout is False) and to
+    on_stdout; stderr lines go to the logger and to on_stderr. With a
+    timeout, the whole process group is killed on expiry. When check is
+    set, a non-zero exit raises CalledProcessError and a timeout raises
+    TimeoutExpired, like subprocess.run. With stdout_file (a binary file
+    object), stdout is written there untouched instead of being streamed.
+    """
+    global _spawn_count
+    argv = [str(arg) for arg in argv]
+    with span(" ".join(argv[:2]), cwd=cwd) as command_span:
+        if logger:
+            logger.log(f"Executing command: {subprocess.list2cmdline(argv)} (in {cwd})")
+
+        out_sinks, err_sinks = [], []
+        if logger and log_stdout:
+            out_sinks.append(lambda line: logger.log(line.rstrip("\n")))
+        if on_stdout:
+            out_sinks.append(on_stdout)
+        if logger:
+            err_sinks.append(lambda line: logger.log(line.rstrip("\n")))
+        if on_stderr:
+            err_sinks.append(on_stderr)
+        out_lines = [] if capture else None
+        err_lines = [] if capture else None
+
+        with _spawn_lock:
+            _spawn_count += 1
+        started = time.monotonic()
+        process = subprocess.Popen(
+            argv,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=stdout_file or subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+            errors="replace",
+            start_new_session=True
+        )
+        timed_out = threading.Event()
+        timer = None
+        if timeout:
+            def expire():
+                timed_out.set()
+                _kill_group(process)
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+
+        err_thread = threading.Thread(
+            target=_pump, args=(process.stderr, err_sinks, err_lines), daemon=True
+        )
+        err_thread.start()
+        try:
+            if stdout_file is None:
+                _pump(process.stdout, out_sinks, out_lines)
+            returncode = process.wait()
+            err_thread.join()
+        except BaseException:
+            _kill_group(process)
+            process.wait()
+            raise
+        finally:
+            if timer:
+                timer.cancel()
+
+        command_span.set(returncode=returncode, timed_out=timed_out.is_set())
+        result = CommandResult(
+            argv, cwd, returncode,
+            "".join(out_lines) if capture and stdout_file is None else None,
+            "".join(err_lines) if capture else None,
+            time.monotonic() - started,
+            timed_out.is_set()
+        )
+        if check:
+            if result.timed_out:
+                if logger:
+                    logger.log(f"Command timed out after {timeout}s: {subprocess.list2cmdline(argv)}")
+                raise subprocess.TimeoutExpired(argv, timeout, result.stdout, result.stderr)
+            if returncode != 0:
+                if logger:
+                    logger.log(f"Command failed with exit code {returncode}: {subprocess.list2cmdline(argv)}")
+                raise subprocess.CalledProcessError(returncode, argv, result.stdout, result.stderr)
+        return result
@@ -0,0 +1,215 @@
+import cProfile
+import io
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from config.main import (
+    PROFILE_DIR, PROFILE_TOP, PROFILE_WALL_INTERVAL, PROFILE_MEM_FRAMES, PROFILE_SIGNAL_MODE
+)
+
+class CpuProfiler:
+    """cProfile of the starting thread and of every thread started while it runs.
+
+    Threads already running elsewhere are not profiled, which suits the
+    web server: each request is handled on a new thread.
+    """
+
+    suffix = "pstats"
+
+    def __init__(self):
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._running = False
+
+    def _enable(self):
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def _thread_hook(self, frame, event, arg):
+        # First profiling event of a new thread: hand over to cProfile
+        sys.setprofile(None)
+        if self._running:
+            self._enable()
+
+    def start(self):
+        self._running = True
+        threading.setprofile(self._thread_hook)
+        self._enable()
+
+    def stop(self, path, top=PROFILE_TOP):
+        """Stop, write the merged pstats file to path and return the top functions by cumulative time."""
+        self._running = False
+        threading.setprofile(None)
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.disable()
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(path)
+        summary = io.StringIO()
+        stats.stream = summary
+        stats.sort_stats("cumulative").print_stats(top)
+        return summary.getvalue().strip()
+
+class MemProfiler:
+    """tracemalloc report of the memory still allocated when profiling stops."""
+
+    suffix = "txt"
+
+    def __init__(self, frames=PROFILE_MEM_FRAMES):
+        self.frames = frames
+
+    def start(self):
+        tracemalloc.start(self.frames)
+
+    def stop(self, path, top=PROFILE_TOP):
+        """Stop, write the top allocation sites (with tracebacks) to path and return the top lines."""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        lines = [f"Traced memory: {current / 1024:.1f} KiB current, {peak / 1024:.1f} KiB peak"]
+        lines.append(f"Top {top} allocation sites:")
+        by_line = snapshot.statistics("lineno")[:top]
+        lines.extend(f"  {stat}" for stat in by_line)
+        summary = "\n".join(lines)
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(summary + "\n\nTracebacks:\n")
+            for stat in snapshot.statistics("traceback")[:top]:
+                f.write(f"\n{stat.count} block(s), {stat.size / 1024:.1f} KiB\n")
+                f.write("\n".join(stat.traceback.format()) + "\n")
+        return summary
+
+class WallProfiler:
+    """Sampling profiler recording the stack of every thread at a fixed wall-clock interval.
+
+    Waiting counts as much as running, so it shows where threads spend
+    their time blocked on svn commands, locks or sockets.
+    """
+
+    suffix = "folded"
+
+    def __init__(self, interval=PROFILE_WALL_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[(names.get(ident, str(ident)),) + tuple(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="wall-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self, path, top=PROFILE_TOP):
+        """Stop, write collapsed stacks (flamegraph.pl / speedscope input) to path and return the top functions."""
+        self._stop.set()
+        self._thread.join()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(";".join(stack) + f" {count}\n")
+
+        total = sum(self.samples.values())
+        inclusive, own = Counter(), Counter()
+        for stack, count in self.samples.items():
+            for function in set(stack[1:]):
+                inclusive[function] += count
+            if len(stack) > 1:
+                own[stack[-1]] += count
+        lines = [f"{total} sample(s) every {self.interval * 1000:.1f}ms; top {top} by inclusive time:"]
+        for function, count in inclusive.most_common(top):
+            lines.append(
+                f"  {count / total:6.1%} total {own[function] / total:6.1%} self  {function}"
+            )
+        return "\n".join(lines) if total else "No samples collected"
+
+PROFILERS = {"cpu": CpuProfiler, "mem": MemProfiler, "wall": WallProfiler}
+PROFILE_MODES = tuple(PROFILERS)
+
+def create_profiler(mode):
+    if mode not in PROFILERS:
+        raise ValueError(f"Unknown profile mode: {mode} (expected {', '.join(PROFILE_MODES)})")
+    return PROFILERS[mode]()
+
+def report_path(profiler, mode, label, out_dir=PROFILE_DIR):
+    """New report file name under out_dir for one profiling run."""
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    name = label.replace(os.sep, "_")
+    return os.path.join(out_dir, f"{name}-{mode}-{stamp}-{os.getpid()}.{profiler.suffix}")
+
+@contextmanager
+def profiled(mode, label, out_dir=PROFILE_DIR):
+    """Profile the block; the report is written and summarised on stderr when it exits."""
+    profiler = create_profiler(mode)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        path = report_path(profiler, mode, label, out_dir)
+        summary = profiler.stop(path)
+        sys.stderr.write(f"{summary}\nProfile written to {path}\n")
+
+_active = None
+_active_lock = threading.Lock()
+
+def toggle(mode=PROFILE_SIGNAL_MODE, label="runtime", out_dir=PROFILE_DIR):
+    """Start profiling if it is not running, else stop it and write the report.
+
+    Returns a status dict: running, mode and, after stopping, path and summary.
+    """
+    global _active
+    with _active_lock:
+        if _active is None:
+            profiler = create_profiler(mode)
+            profiler.start()
+            _active = (mode, profiler)
+            return {"running": True, "mode": mode}
+        mode, profiler = _active
+        _active = None
+    path = report_path(profiler, mode, label, out_dir)
+    return {"running": False, "mode": mode, "path": path, "summary": profiler.stop(path)}
+
+def active_mode():
+    """Mode of the profiling started by toggle(), or None."""
+    with _active_lock:
+        return _active[0] if _active else None
+
+def install_signal_toggle(label, mode=PROFILE_SIGNAL_MODE, signum=signal.SIGUSR1):
+    """Make signum (SIGUSR1 by default) toggle profiling in this process."""
+    def handler(signum, frame):
+        state = toggle(mode, label)
+        if state["running"]:
+            print(f"Profiling ({state['mode']}) started")
+        else:
+            print(f"{state['summary']}\nProfile written to {state['path']}")
+
+    signal.signal(signum, handler)
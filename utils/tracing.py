@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Finished spans kept in memory; older ones are dropped
+MAX_SPANS = 10000
+
+_spans = deque(maxlen=MAX_SPANS)
+_ids = itertools.count(1)
+_local = threading.local()
+# Offset from the monotonic clock to wall-clock microseconds, for exports
+_EPOCH_US = (time.time() - time.monotonic()) * 1e6
+
+class Span:
+    """One timed operation; nested spans share their root's trace id."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attrs", "thread_id")
+
+    def __init__(self, name, trace_id, parent_id, attrs):
+        self.name = name
+        self.span_id = next(_ids)
+        self.trace_id = trace_id or self.span_id
+        self.parent_id = parent_id
+        self.start = time.monotonic()
+        self.end = None
+        self.attrs = attrs
+        self.thread_id = threading.get_ident()
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.monotonic()) - self.start
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def current_span():
+    """The innermost open span of this thread, or None."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+@contextmanager
+def span(name, parent=None, **attrs):
+    """Time the block as a span, nested under parent or this thread's current span.
+
+    Pass parent explicitly to nest work running on another thread. An
+    exception leaving the block is recorded as the "error" attribute.
+    """
+    stack = _stack()
+    parent = parent or (stack[-1] if stack else None)
+    s = Span(name, parent.trace_id if parent else None, parent.span_id if parent else None, attrs)
+    stack.append(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.attrs["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end = time.monotonic()
+        stack.pop()
+        _spans.append(s)
+
+def traced(name=None, **attrs):
+    """Decorator running the function inside a span named after it."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attrs):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def spans(trace_id=None):
+    """Finished spans still in the buffer, of one trace or all, in start order."""
+    selected = [s for s in list(_spans) if trace_id is None or s.trace_id == trace_id]
+    return sorted(selected, key=lambda s: s.start)
+
+def clear():
+    _spans.clear()
+
+def breakdown(trace_id):
+    """Aggregate a trace's spans by their path of names from the root.
+
+    Returns dicts with path, depth, count, total and self seconds, as a
+    depth-first tree ordered by first start, so repeated calls such as many svn
+    commands under one stage collapse into one line.
+    """
+    trace = spans(trace_id)
+    by_id = {s.span_id: s for s in trace}
+    child_time = {}
+    for s in trace:
+        if s.parent_id in by_id:
+            child_time[s.parent_id] = child_time.get(s.parent_id, 0.0) + s.duration
+
+    paths = {}
+    rows = {}
+    for s in trace:
+        path = paths.get(s.parent_id, ()) + (s.name,)
+        paths[s.span_id] = path
+        row = rows.get(path)
+        if row is None:
+            row = rows[path] = {"path": path, "depth": len(path) - 1, "count": 0,
+                                "total": 0.0, "self": 0.0, "first": s.start}
+        row["count"] += 1
+        row["total"] += s.duration
+        row["self"] += max(s.duration - child_time.get(s.span_id, 0.0), 0.0)
+    # Depth-first: each path right after its parent, siblings by first start
+    return sorted(
+        rows.values(),
+        key=lambda row: [rows[row["path"][:i]]["first"] for i in range(1, len(row["path"]) + 1)]
+    )
+
+def format_breakdown(trace_id):
+    """Format breakdown() as an indented table for logging."""
+    lines = []
+    for row in breakdown(trace_id):
+        count = f" x{row['count']}" if row["count"] > 1 else ""
+        lines.append(
+            f"  {'  ' * row['depth']}{row['path'][-1]}{count}: "
+            f"{row['total']:.3f}s (self {row['self']:.3f}s)"
+        )
+    return "\n".join(lines)
+
+def chrome_trace(trace_id=None):
+    """Spans as Chrome trace-event JSON (load in chrome://tracing or Perfetto)."""
+    pid = os.getpid()
+    events = []
+    for s in spans(trace_id):
+        events.append({
+            "name": s.name,
+            "cat": "trace",
+            "ph": "X",
+            "ts": round(_EPOCH_US + s.start * 1e6, 3),
+            "dur": round(s.duration * 1e6, 3),
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)
+                     for key, value in s.attrs.items()},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def export_chrome_trace(path, trace_id=None):
+    """Write chrome_trace() to path."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(trace_id), f)
+    return path